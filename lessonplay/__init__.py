@@ -0,0 +1 @@
+"""Lesson Play 데이터 정리 앱에서 여러 페이지가 함께 쓰는 모듈 모음"""
@@ -0,0 +1,51 @@
+"""분석용 코딩 CSV 저장소
+
+data/analysis-*/<수업>_<학생>.csv 를 모두 찾아 (분석, 수업, 학생, 파일 경로) 목록으로 만들고,
+고른 학생의 CSV만 읽어서 학생마다 집계(aggregate_coded)를 프로세스 공유 캐시에 보관합니다.
+"""
+import glob
+import os
+
+import pandas as pd
+
+from lessonplay.coding import aggregate_coded
+from lessonplay.ingest import BASE_DIR
+from lessonplay.shared_cache import get_shared
+from lessonplay.utterances import read_coded_csv
+
+ANALYSIS_PREFIX = "analysis-"
+STUDENT_KEY = "학생 키"
+
+
+def discover_coded_csvs(base_dir: str = BASE_DIR) -> pd.DataFrame:
+    """data/analysis-*/ 아래 코딩 CSV 목록
+
+    index: 학생 키 ('analysis-251125/rehearsal_김세진'), 컬럼: 분석('251125'), 수업('rehearsal'), 학생('김세진'), 파일 경로
+    """
+    rows = []
+    for path in sorted(glob.glob(os.path.join(base_dir, f"{ANALYSIS_PREFIX}*", "*.csv"))):
+        folder = os.path.basename(os.path.dirname(path))
+        stem = os.path.splitext(os.path.basename(path))[0]
+        lesson, _, student = stem.partition("_")
+        if not student:
+            lesson, student = "", stem
+        rows.append({
+            STUDENT_KEY: f"{folder}/{stem}",
+            "분석": folder[len(ANALYSIS_PREFIX):],
+            "수업": lesson,
+            "학생": student,
+            "파일 경로": path,
+        })
+    return pd.DataFrame(rows, columns=[STUDENT_KEY, "분석", "수업", "학생", "파일 경로"]).set_index(STUDENT_KEY)
+
+
+def student_label(entries: pd.DataFrame, key: str) -> str:
+    """화면에 보일 이름 — '김세진 (rehearsal)'"""
+    entry = entries.loc[key]
+    return f"{entry['학생']} ({entry['수업']})" if entry["수업"] else entry["학생"]
+
+
+def load_aggregate(path: str, digest: str) -> dict:
+    """학생 한 명의 코딩 CSV 집계 (aggregate_coded) — 내용 해시(digest)가 같으면 프로세스 안의 모든 세션이
+    한 번 계산한 결과를 같이 씁니다. 동시에 처음 열어도 한 세션만 읽고 나머지는 기다립니다."""
+    return get_shared(("coded", path), digest, lambda: aggregate_coded(read_coded_csv(path)))
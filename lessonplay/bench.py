@@ -0,0 +1,281 @@
+"""성능 측정 (벤치마크)
+
+    python -m lessonplay.bench [--sizes 1000,10000,100000] [--out bench_results.json] [--workdir DIR] [--keep]
+
+data/Rehearsal/<날짜폴더>/<사용자>_<YYYY. M. D. 오후 H-MM-SS>.csv 와 같은 모양의 가짜 전사 코퍼스를 세션 수별로 만들고,
+단계마다 걸린 시간(wall), 최대 메모리(peak RSS), 파일당 처리량을 JSON으로 씁니다.
+코퍼스는 고정 시드로 만들어서 같은 코드면 같은 입력을 측정합니다 — 두 실행의 JSON을 diff 해서 비교하세요.
+
+측정 단계:
+- summary_scan_cold / summary_scan_warm: 요약 페이지의 세션 인덱스 갱신 (update_index) — 처음 / 바뀐 파일 없음
+- summary_table: 회차·High/Low 매칭 + 필터 인덱스 (요약 페이지 ②)
+- convert_txt: convert_all_csv_to_txt
+- coded_aggregate: 분석 페이지의 코딩 CSV 집계 (aggregate_coded)
+- figures: 분석 그래프 세 개 생성 + JSON 직렬화
+각 단계는 새 프로세스에서 돌려서 peak RSS가 단계별 값이 되게 합니다 (fork가 없는 OS에서는 같은 프로세스).
+"""
+import argparse
+import datetime
+import json
+import multiprocessing
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from lessonplay.convert import convert_all_csv_to_txt
+from lessonplay.ingest import FOLDERS
+
+DEFAULT_SIZES = [1000, 10000, 100000]
+SEED = 20250911
+
+# 가짜 전사에 쓰는 문장들 (첫 교사 발화로 시나리오가 정해짐)
+OPENINGS = [
+    "120의 약수를 찾고 있구나. 그런데 아까 짝을 찾아봤더니 끝났다는 말이었지?",
+    "선생님, a×b=0이면 a=0 또는 b=0이라는 명제가 이해가 안 돼요.",
+]
+TEACHER_LINES = [
+    "왜 그렇게 생각했는지 설명해 줄래?",
+    "좋아, 그럼 다른 방법으로도 찾아볼까?",
+    "그 수를 두 수의 곱으로 나타내 보자.",
+    "네 말은 둘 중 적어도 하나는 0이라는 뜻이구나.",
+]
+STUDENT_LINES = ["약수요?", "잘 모르겠어요.", "2 곱하기 60이요.", "둘 다 0이어야 하는 것 같아요."]
+TMSSR_CODES = ["Eliciting", "Responding", "Facilitating", "Extending", "-"]
+
+
+# ---------------------------
+# ① 가짜 데이터 만들기
+# ---------------------------
+def _session_time(rng, day: datetime.date):
+    """오전 9시 ~ 오후 5시 사이 임의 시각 → (CSV 안 표기, 파일명 표기)"""
+    seconds = int(rng.integers(9 * 3600, 17 * 3600))
+    hour, minute, second = seconds // 3600, seconds // 60 % 60, seconds % 60
+    ampm = "오후" if hour >= 12 else "오전"
+    h12 = hour % 12 or 12
+    prefix = f"{day.year}. {day.month}. {day.day}. {ampm} {h12}"
+    return f"{prefix}:{minute:02d}:{second:02d}", f"{prefix}-{minute:02d}-{second:02d}"
+
+
+def generate_corpus(base_dir: str, n_sessions: int, seed: int = SEED):
+    """전사 CSV n_sessions개와 data/highlow.csv를 base_dir 아래에 만듭니다. 반환값: 만든 CSV 수"""
+    rng = np.random.default_rng(seed)
+    users = [f"학생{i:03d}" for i in range(max(8, n_sessions // 40))]
+    days = [datetime.date(2025, 9, 11) + datetime.timedelta(days=7 * w) for w in range(10)]
+    highlow = []
+
+    for i in range(n_sessions):
+        folder = FOLDERS[int(rng.random() < 0.3)]
+        day = days[int(rng.integers(len(days)))]
+        user = users[int(rng.integers(len(users)))]
+        in_csv, in_name = _session_time(rng, day)
+        # 같은 학생이 같은 초에 시작한 세션이 있어도 파일명이 겹치지 않게 번호를 붙임
+        name = f"{user}_{in_name} ({i}).csv"
+        session_dir = os.path.join(base_dir, folder, day.strftime("%y%m%d"))
+        os.makedirs(session_dir, exist_ok=True)
+
+        n_rows = int(rng.integers(8, 23))
+        feedback = rng.random() < 0.5
+        opening = OPENINGS[int(rng.integers(len(OPENINGS)))]
+        rows = []
+        for r in range(n_rows):
+            teacher = r % 2 == 0
+            if r == 0:
+                message = opening
+            elif teacher:
+                message = TEACHER_LINES[int(rng.integers(len(TEACHER_LINES)))]
+            else:
+                message = STUDENT_LINES[int(rng.integers(len(STUDENT_LINES)))]
+            row = [user, in_csv, "교사" if teacher else "학생", message]
+            if feedback:
+                row.append("## 피드백 분석" if r == 0 else "")
+            rows.append(row)
+        columns = ["사용자", "날짜/시간", "화자", "메시지"] + (["AI 피드백"] if feedback else [])
+        pd.DataFrame(rows, columns=columns).to_csv(
+            os.path.join(session_dir, name), index=False, encoding="utf-8-sig", quoting=1
+        )
+        highlow.append((os.path.splitext(name)[0], int(rng.integers(0, 6)), int(rng.integers(0, 6))))
+
+    pd.DataFrame(highlow, columns=["Filename", "High", "Low"]).to_csv(
+        os.path.join(base_dir, "highlow.csv"), index=False
+    )
+    return n_sessions
+
+
+def coded_frame(n_rows: int, seed: int = SEED) -> pd.DataFrame:
+    """분석용 코딩 CSV와 같은 컬럼의 가짜 프레임 (문자열 dtype, read_coded_csv 결과와 같은 모양)"""
+    rng = np.random.default_rng(seed)
+    days = pd.date_range("2025-09-11", periods=10, freq="7D").strftime("%Y-%m-%d").to_numpy()
+    n_rounds = max(3, n_rows // 400)
+    tmssr = np.array(TMSSR_CODES)[rng.integers(len(TMSSR_CODES), size=n_rows)]
+    potential = np.where(tmssr == "-", "-", np.array(["High", "Low"])[rng.integers(2, size=n_rows)])
+    return pd.DataFrame({
+        "날짜": days[rng.integers(len(days), size=n_rows)],
+        "회차": rng.integers(1, n_rounds + 1, size=n_rows).astype(str),
+        "화자": np.where(tmssr == "-", "학생", "교사"),
+        "메시지": "…",
+        "TMSSR": tmssr,
+        "Potential": potential,
+    })
+
+
+# ---------------------------
+# ② 단계 정의 — (이름, 측정할 작업, 처리 건수)
+# ---------------------------
+def _stages(workdir: str, n_sessions: int):
+    base_dir = os.path.join(workdir, "data")
+    index_path = os.path.join(workdir, "cache", "session_index.parquet")
+    store_dir = os.path.join(workdir, "cache", "utterances")
+    highlow_path = os.path.join(base_dir, "highlow.csv")
+
+    def update(rebuild):
+        from lessonplay.session_index import update_index
+        index_df, errors, _ = update_index(rebuild=rebuild, base_dir=base_dir, path=index_path, store_dir=store_dir)
+        return len(index_df)
+
+    def summary_table():
+        from lessonplay.filters import build_filter_index, select_positions
+        from lessonplay.session_index import load_index
+        from lessonplay.summary import build_summary
+        df_all, _ = build_summary(load_index(index_path), highlow_path)
+        filter_index = build_filter_index(
+            df_all, ["수업", "시나리오", "사용자"], flags={"입력 있음": df_all["입력 수"] > 0}
+        )
+        select_positions(filter_index, {"수업": "Rehearsal", "시나리오": "약수", "사용자": None}, ["입력 있음"])
+        return len(df_all)
+
+    def convert():
+        converted, errors = convert_all_csv_to_txt(base_dir, FOLDERS, os.path.join(workdir, "converted_txt"))
+        return len(converted)
+
+    # 코딩 CSV는 세션당 발화 10개 정도로 가정
+    n_coded = n_sessions * 10
+
+    def aggregate():
+        from lessonplay.coding import aggregate_coded
+        aggregate_coded(coded_frame(n_coded))
+        return n_coded
+
+    def figures():
+        from lessonplay.coding import aggregate_coded
+        from lessonplay.plots import plot_summary, plot_tmssr_potential_trends, plot_tmssr_proportions
+        agg = aggregate_coded(coded_frame(n_coded))
+        for fig in (plot_summary(agg["summary"]), plot_tmssr_proportions(agg["tmssr"]),
+                    plot_tmssr_potential_trends(agg["potential"], agg["labels"])):
+            fig.to_json()
+        return n_coded
+
+    return [
+        ("summary_scan_cold", lambda: update(True), n_sessions),
+        ("summary_scan_warm", lambda: update(False), n_sessions),
+        ("summary_table", summary_table, n_sessions),
+        ("convert_txt", convert, n_sessions),
+        ("coded_aggregate", aggregate, n_coded),
+        ("figures", figures, n_coded),
+    ]
+
+
+# ---------------------------
+# ③ 측정
+# ---------------------------
+def _peak_rss_mb():
+    """이 프로세스와 (끝난) 자식 프로세스 중 가장 큰 최대 RSS (MB). resource 모듈이 없으면 None"""
+    if resource is None:
+        return None
+    peak = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+               resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    # Linux는 KB, macOS는 바이트 단위
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def _timed(work, queue=None):
+    start = time.perf_counter()
+    work()
+    outcome = {"wall_s": round(time.perf_counter() - start, 4), "peak_rss_mb": _peak_rss_mb()}
+    if queue is None:
+        return outcome
+    queue.put(outcome)
+
+
+def run_stage(work) -> dict:
+    """work()를 새 프로세스(fork)에서 실행하고 {"wall_s", "peak_rss_mb"}를 반환합니다."""
+    if "fork" not in multiprocessing.get_all_start_methods():
+        return _timed(work)
+    ctx = multiprocessing.get_context("fork")
+    queue = ctx.Queue()
+    process = ctx.Process(target=_timed, args=(work, queue))
+    process.start()
+    outcome = queue.get()
+    process.join()
+    return outcome
+
+
+def run_benchmarks(sizes=DEFAULT_SIZES, workdir=None, keep: bool = False, log=print) -> dict:
+    """세션 수마다 코퍼스를 만들고 모든 단계를 측정 → {"meta", "results"}"""
+    results = []
+    for n_sessions in sizes:
+        size_dir = tempfile.mkdtemp(prefix=f"lessonplay-bench-{n_sessions}-", dir=workdir)
+        try:
+            log(f"📁 {n_sessions}개 세션 코퍼스 생성 중… ({size_dir})")
+            start = time.perf_counter()
+            generate_corpus(os.path.join(size_dir, "data"), n_sessions)
+            log(f"   생성 {time.perf_counter() - start:.1f}s")
+
+            for stage, work, n_items in _stages(size_dir, n_sessions):
+                outcome = run_stage(work)
+                outcome.update({
+                    "sessions": n_sessions,
+                    "stage": stage,
+                    "items": n_items,
+                    "items_per_s": round(n_items / outcome["wall_s"], 1) if outcome["wall_s"] else None,
+                })
+                results.append(outcome)
+                log(f"   {stage:<18} {outcome['wall_s']:>9.3f}s  {outcome['peak_rss_mb']} MB  "
+                    f"{outcome['items_per_s']}/s")
+        finally:
+            if not keep:
+                shutil.rmtree(size_dir, ignore_errors=True)
+
+    meta = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "seed": SEED,
+        "started": datetime.datetime.now().isoformat(timespec="seconds"),
+    }
+    return {"meta": meta, "results": results}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Lesson Play 데이터 처리 벤치마크")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)),
+                        help="쉼표로 구분한 세션 수 (기본: 1000,10000,100000)")
+    parser.add_argument("--out", default="bench_results.json", help="결과 JSON 경로")
+    parser.add_argument("--workdir", help="코퍼스를 만들 폴더 (기본: 시스템 임시 폴더)")
+    parser.add_argument("--keep", action="store_true", help="측정 후 코퍼스를 지우지 않음")
+    args = parser.parse_args(argv)
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    report = run_benchmarks(sizes, args.workdir, args.keep)
+    with open(args.out, "w", encoding="utf-8") as f:
+        # 단계 결과는 정해진 순서로, 키는 정렬해서 실행끼리 diff 하기 쉽게
+        json.dump(report, f, ensure_ascii=False, indent=1, sort_keys=True)
+        f.write("\n")
+    print(f"✅ {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,46 @@
+"""첫 화면 부트스트랩 파일
+
+요약 페이지가 마지막으로 만든 필터 선택지와 행 수를 data/.cache/bootstrap.json에 적어 둡니다.
+서버를 새로 띄운 뒤의 첫 실행에서도 pandas·pyarrow를 불러오거나 CSV를 훑기 전에 이 작은 JSON만 읽어
+필터 상자와 세션 수를 먼저 그리고, 무거운 작업은 그 뒤에 합니다.
+첫 화면 전에 불러오는 모듈이므로 표준 라이브러리만 씁니다.
+"""
+import json
+import os
+import uuid
+
+BOOTSTRAP_PATH = os.path.join("data", ".cache", "bootstrap.json")
+
+
+def load_bootstrap(path: str = BOOTSTRAP_PATH):
+    """{"version", "rows", "options": {컬럼: 정렬된 값 목록}, "flags": {이름: 행 수}} — 없거나 깨졌으면 None"""
+    try:
+        with open(path, encoding="utf-8") as f:
+            payload = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(payload, dict) or not {"version", "rows", "options", "flags"} <= payload.keys():
+        return None
+    return payload
+
+
+def save_bootstrap(data_version: str, filter_index: dict, path: str = BOOTSTRAP_PATH) -> bool:
+    """필터 인덱스(lessonplay.filters.build_filter_index 결과) → 부트스트랩 파일 (임시 파일에 쓴 뒤 교체)
+
+    저장된 파일이 이미 같은 데이터 버전이면 쓰지 않습니다. 새로 썼으면 True.
+    """
+    current = load_bootstrap(path)
+    if current is not None and current["version"] == data_version:
+        return False
+    payload = {
+        "version": data_version,
+        "rows": int(filter_index["n_rows"]),
+        "options": filter_index["options"],
+        "flags": {name: len(positions) for name, positions in filter_index["flags"].items()},
+    }
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+    return True
@@ -0,0 +1,107 @@
+"""분석용 코딩 CSV 집계 (날짜·회차 × TMSSR × Potential)
+
+코딩 CSV(날짜, 회차, 화자, 메시지, TMSSR, Potential)를 한 번만 정규화해 세션·TMSSR·Potential 정수 코드로 바꾸고,
+(세션 × TMSSR × Potential) 개수 큐브 하나를 bincount로 만듭니다.
+High/Low/Total 추이, 세션별 TMSSR 비율, TMSSR × Potential 막대 그래프는 모두 이 큐브를 잘라서 씁니다.
+"""
+import numpy as np
+import pandas as pd
+
+POTENTIALS = ["High", "Low"]
+
+
+def _session_codes(df: pd.DataFrame):
+    """행마다 세션(날짜, 회차) 코드 — 세션은 (날짜, 회차) 순. 날짜를 읽을 수 없는 행은 -1
+
+    반환값: (codes, sessions) — sessions는 '날짜'(datetime.date), '회차'(int) 컬럼 프레임
+    """
+    if '회차' not in df.columns:
+        raise RuntimeError("CSV에 '회차' 컬럼이 필요합니다.")
+    if '날짜' not in df.columns:
+        raise RuntimeError("CSV에 '날짜' 컬럼이 필요합니다.")
+
+    rounds = df['회차'].astype(int).to_numpy()
+    # 서로 다른 날짜 문자열만 파싱
+    date_codes, date_uniques = pd.factorize(df['날짜'], sort=False)
+    parsed = pd.to_datetime(pd.Series(date_uniques, dtype=object))
+    valid = (date_codes >= 0) & parsed.notna().to_numpy()[date_codes]
+
+    # 같은 날의 다른 표기('2025-9-18'/'2025-09-18')는 같은 날짜 → 날짜 순위로 묶음
+    days = parsed.dt.date.to_numpy()
+    day_uniques, day_rank = np.unique(days[date_codes[valid]], return_inverse=True)
+
+    # (날짜, 회차) 쌍 → 세션 코드 (정렬된 순서)
+    pairs, session_codes = np.unique(np.stack([day_rank, rounds[valid]]), axis=1, return_inverse=True)
+    codes = np.full(len(df), -1, dtype=np.int64)
+    codes[valid] = session_codes.ravel()
+    sessions = pd.DataFrame({'날짜': day_uniques[pairs[0]], '회차': pairs[1]})
+    return codes, sessions
+
+
+def aggregate_coded(df: pd.DataFrame) -> dict:
+    """코딩 CSV 프레임 → 세 그래프용 집계 (원본 df는 바꾸지 않음)
+
+    반환 dict:
+    - "summary": 날짜, 회차, high, low, total, session_label — 세션별 Potential High/Low 수와 Potential이 있는 발화 수
+    - "tmssr": 날짜, 회차, <TMSSR 범주들>, total_count, session_label — TMSSR('-' 제외)이 있는 세션만
+    - "potential": index (날짜, 회차), 컬럼 (TMSSR, Potential) 개수 피벗 — High/Low 코딩이 있는 조합만
+    - "labels": "potential" 행마다 '날짜 #회차'
+    """
+    codes, sessions = _session_codes(df)
+    n_sessions = len(sessions)
+    labels = sessions['날짜'].astype(str) + ' #' + sessions['회차'].astype(str)
+
+    potential = df['Potential'] if 'Potential' in df.columns else pd.Series('-', index=df.index)
+    tmssr = df['TMSSR'].fillna('Unknown') if 'TMSSR' in df.columns else pd.Series('Unknown', index=df.index)
+
+    # TMSSR: '-'는 분석에서 제외 (코드 -1), 범주는 이름순
+    tmssr_codes, tmssr_cats = pd.factorize(tmssr.where(tmssr != '-'), sort=True)
+    # Potential: High=0, Low=1, 나머지 -1
+    potential_codes = pd.Categorical(potential, categories=POTENTIALS).codes.astype(np.int64)
+
+    # (세션 × TMSSR(+제외 칸) × Potential(+기타 칸)) 개수 큐브 — 행을 한 번만 훑음
+    n_tmssr = len(tmssr_cats) + 1
+    n_potential = len(POTENTIALS) + 1
+    in_session = codes >= 0
+    flat = ((codes * n_tmssr + tmssr_codes + 1) * n_potential + potential_codes + 1)[in_session]
+    cube = np.bincount(flat, minlength=n_sessions * n_tmssr * n_potential)
+    cube = cube.reshape(n_sessions, n_tmssr, n_potential)
+
+    # ① 세션별 High / Low / Total (Total = Potential 값이 비어 있지 않은 발화 수)
+    by_potential = cube.sum(axis=1)
+    missing = np.bincount(codes[in_session & potential.isna().to_numpy()], minlength=n_sessions)
+    summary = sessions.assign(
+        high=by_potential[:, 1],
+        low=by_potential[:, 2],
+        total=by_potential.sum(axis=1) - missing,
+        session_label=labels,
+    )
+
+    # ② 세션별 TMSSR 개수 ('-' 제외 칸을 뺀 나머지)
+    by_tmssr = cube[:, 1:, :].sum(axis=2)
+    has_tmssr = by_tmssr.sum(axis=1) > 0
+    present = by_tmssr[has_tmssr].sum(axis=0) > 0
+    tmssr_pivot = sessions[has_tmssr].reset_index(drop=True)
+    counts = pd.DataFrame(by_tmssr[has_tmssr][:, present], columns=pd.Index(tmssr_cats[present], name='TMSSR'))
+    tmssr_pivot = pd.concat([tmssr_pivot, counts], axis=1)
+    tmssr_pivot.columns.name = 'TMSSR'
+    tmssr_pivot['total_count'] = counts.sum(axis=1)
+    tmssr_pivot['session_label'] = labels[has_tmssr].to_numpy()
+
+    # ③ 세션별 (TMSSR, Potential) 개수 — High/Low 칸만
+    by_pair = cube[:, 1:, 1:].reshape(n_sessions, -1)
+    has_pair = by_pair.sum(axis=1) > 0
+    pair_present = by_pair[has_pair].sum(axis=0) > 0
+    pair_columns = pd.MultiIndex.from_product([tmssr_cats, POTENTIALS], names=['TMSSR', 'Potential'])
+    potential_pivot = pd.DataFrame(
+        by_pair[has_pair][:, pair_present],
+        index=pd.MultiIndex.from_frame(sessions[has_pair]),
+        columns=pair_columns[pair_present],
+    )
+
+    return {
+        "summary": summary,
+        "tmssr": tmssr_pivot,
+        "potential": potential_pivot,
+        "labels": labels[has_pair].tolist(),
+    }
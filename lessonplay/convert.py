@@ -0,0 +1,220 @@
+"""전사 CSV → TXT 변환
+
+한 줄에 발화 하나씩 '[화자] 메시지' 형식으로 씁니다. 일반 모드는 ingest()로 여러 파일을 병렬로 읽고,
+스트리밍 모드는 파일을 한 번에 한 덩어리(chunk)씩만 읽어서 TXT와 ZIP에 바로 흘려 보냅니다.
+증분 모드는 manifest에 기록된 원본 CSV의 (mtime, 크기)와 비교해서 바뀐 파일만 다시 변환합니다.
+"""
+import json
+import os
+import uuid
+import zipfile
+
+import pandas as pd
+
+from lessonplay.corpus import corpus_from_results, session_lines
+from lessonplay.ingest import BASE_DIR, FOLDERS, find_transcripts, ingest, scan_files
+
+OUTPUT_DIR = "converted_txt"
+
+# 증분 모드에서 원본 CSV의 (mtime, 크기)를 기록해 두는 파일 (converted_txt/ 옆)
+MANIFEST_PATH = OUTPUT_DIR + ".manifest.json"
+MANIFEST_VERSION = 1
+
+# 스트리밍 모드에서 한 번에 읽는 행 수
+CHUNK_ROWS = 2000
+
+
+def txt_name_for(file_path: str) -> str:
+    """CSV 경로 → TXT 파일명 (확장자만 바꿈)"""
+    return os.path.splitext(os.path.basename(file_path))[0] + ".txt"
+
+
+def format_lines(speakers, messages):
+    """화자·메시지 쌍을 '[화자] 메시지' 줄로 바꿉니다. 둘 다 비어 있는 행은 건너뜁니다."""
+    for s, m in zip(speakers, messages):
+        # 빈 칸(None)은 예전 출력과 같게 'nan'으로 씁니다.
+        s = "nan" if s is None else str(s)
+        m = "nan" if m is None else str(m)
+        if s.strip() or m.strip():
+            yield f"[{s}] {m}"
+
+
+def _write_lines(lines, txt_path: str):
+    """줄을 하나씩 써 내려가고, 다 쓴 다음에 최종 경로로 옮깁니다 (중간에 실패하면 기존 파일 유지)."""
+    tmp_path = f"{txt_path}.{uuid.uuid4().hex}.tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for i, line in enumerate(lines):
+                if i:
+                    f.write("\n")
+                f.write(line)
+        os.replace(tmp_path, txt_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def _convert_parallel(items, output_dir: str):
+    """[(폴더, 파일 경로)] → ([(파일 경로, TXT 경로)], error_files)"""
+    os.makedirs(output_dir, exist_ok=True)
+    converted = []
+    error_files = []
+
+    results, errors = ingest(items, with_messages=True)
+    error_files.extend((e["파일명"], e["오류"]) for e in errors)
+
+    # 화자열(index 2), 메시지열(index 3)
+    error_files.extend((os.path.basename(r["파일 경로"]), "열 구조 부족") for r in results if r["speakers"] is None)
+
+    # 파싱 결과(파이썬 문자열 리스트)는 곧바로 배열 코퍼스로 옮기고 버림 — 헤더 행도 TXT 첫 줄로 씀
+    corpus = corpus_from_results(results, with_header=True)
+    del results
+
+    for code, file_path in corpus["sessions"]["파일 경로"].items():
+        # TXT 파일 저장 (파일명 동일)
+        txt_path = os.path.join(output_dir, txt_name_for(file_path))
+        _write_lines(session_lines(corpus, code), txt_path)
+        converted.append((file_path, txt_path))
+
+    return converted, error_files
+
+
+def convert_all_csv_to_txt(base_dir: str = BASE_DIR, folders=FOLDERS, output_dir: str = OUTPUT_DIR):
+    """data 폴더 내 모든 CSV → TXT 변환 (파싱은 여러 프로세스로 나눠 처리)"""
+    converted, error_files = _convert_parallel(find_transcripts(base_dir, folders), output_dir)
+    return [txt_path for _, txt_path in converted], error_files
+
+
+# ---------------------------
+# 스트리밍 모드
+# ---------------------------
+def iter_transcript_lines(file_path: str, chunksize: int = CHUNK_ROWS):
+    """CSV를 chunksize 행씩 읽으면서 TXT 줄을 내보냅니다. 열이 4개보다 적으면 ValueError."""
+    with pd.read_csv(file_path, header=None, dtype=str, chunksize=chunksize) as reader:
+        for chunk in reader:
+            if chunk.shape[1] < 4:
+                raise ValueError("열 구조 부족")
+            # 빈 칸(NaN)은 format_lines()에서 'nan'으로 바뀌므로 문자열 사본(astype(str))을 만들 필요가 없음
+            yield from format_lines(chunk.iloc[:, 2].tolist(), chunk.iloc[:, 3].tolist())
+
+
+def _convert_streaming(items, zipf, output_dir: str, chunksize: int = CHUNK_ROWS):
+    """[(폴더, 파일 경로)]를 하나씩 변환하고 TXT를 열린 ZipFile에 추가 → ([(파일 경로, TXT 경로)], error_files)"""
+    os.makedirs(output_dir, exist_ok=True)
+    converted = []
+    error_files = []
+
+    for folder, file_path in items:
+        file = os.path.basename(file_path)
+        txt_path = os.path.join(output_dir, txt_name_for(file))
+        try:
+            _write_lines(iter_transcript_lines(file_path, chunksize), txt_path)
+        except Exception as e:
+            error_files.append((file, str(e)))
+            continue
+
+        # ZipFile.write는 파일을 블록 단위로 복사하므로 TXT 전체를 메모리에 올리지 않습니다.
+        zipf.write(txt_path, arcname=os.path.basename(txt_path))
+        converted.append((file_path, txt_path))
+
+    return converted, error_files
+
+
+def stream_convert_csv_to_txt(zip_file, base_dir: str = BASE_DIR, folders=FOLDERS,
+                              output_dir: str = OUTPUT_DIR, chunksize: int = CHUNK_ROWS):
+    """CSV를 하나씩 스트리밍으로 변환하고, 완성된 TXT를 곧바로 zip_file에 추가합니다.
+
+    zip_file: 쓰기 가능한 바이너리 파일 객체 (예: tempfile.TemporaryFile()).
+    메모리에는 CSV 한 덩어리와 ZIP 압축 버퍼만 올라가므로 파일 수와 상관없이 사용량이 일정합니다.
+    반환값: (converted_files, error_files) — convert_all_csv_to_txt()와 같은 형식
+    """
+    with zipfile.ZipFile(zip_file, "w", zipfile.ZIP_DEFLATED) as zipf:
+        converted, error_files = _convert_streaming(
+            find_transcripts(base_dir, folders), zipf, output_dir, chunksize
+        )
+    return [txt_path for _, txt_path in converted], error_files
+
+
+def zip_files(paths, zip_file):
+    """이미 만들어진 TXT 파일들을 zip_file(바이너리 파일 객체)에 담습니다."""
+    with zipfile.ZipFile(zip_file, "w", zipfile.ZIP_DEFLATED) as zipf:
+        for fpath in paths:
+            zipf.write(fpath, arcname=os.path.basename(fpath))
+
+
+# ---------------------------
+# 증분 모드 (바뀐 파일만 변환)
+# ---------------------------
+def load_manifest(path: str = MANIFEST_PATH) -> dict:
+    """{원본 CSV 경로: {"txt", "mtime_ns", "size"}} — 없거나 깨졌으면 빈 dict"""
+    try:
+        with open(path, encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if manifest.get("version") != MANIFEST_VERSION:
+        return {}
+    return manifest.get("files", {})
+
+
+def save_manifest(files: dict, path: str = MANIFEST_PATH):
+    """임시 파일에 쓴 뒤 교체합니다."""
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"version": MANIFEST_VERSION, "files": files}, f, ensure_ascii=False, indent=1)
+    os.replace(tmp_path, path)
+
+
+def sync_csv_to_txt(zip_file=None, streaming: bool = False, base_dir: str = BASE_DIR, folders=FOLDERS,
+                    output_dir: str = OUTPUT_DIR, manifest_path: str = MANIFEST_PATH):
+    """원본 CSV의 (mtime, 크기)를 manifest와 비교해서 새로 생기거나 바뀐 파일만 변환합니다.
+
+    원본이 사라진 TXT는 지웁니다. zip_file을 주면 이번에 변환한 TXT만 ZIP에 담습니다
+    (streaming=True일 때는 zip_file이 꼭 필요합니다).
+    반환값: {"converted": [TXT 경로], "skipped": [TXT 경로], "removed": [TXT 경로], "errors": [(파일명, 오류)]}
+    """
+    manifest = load_manifest(manifest_path)
+    found = scan_files(base_dir, folders)
+
+    pending = []
+    skipped = []
+    for file_path, (folder, mtime_ns, size) in found.items():
+        entry = manifest.get(file_path)
+        if (entry and entry["mtime_ns"] == mtime_ns and entry["size"] == size
+                and os.path.exists(os.path.join(output_dir, entry["txt"]))):
+            skipped.append(os.path.join(output_dir, entry["txt"]))
+        else:
+            pending.append((folder, file_path))
+
+    # 원본이 사라진 TXT 삭제 (같은 이름의 TXT를 다른 원본이 쓰고 있으면 남겨 둠)
+    live_txt = {txt_name_for(p) for p in found}
+    removed = []
+    for file_path in [p for p in manifest if p not in found]:
+        txt_name = manifest.pop(file_path)["txt"]
+        txt_path = os.path.join(output_dir, txt_name)
+        if txt_name not in live_txt and os.path.exists(txt_path):
+            os.remove(txt_path)
+            removed.append(txt_path)
+
+    if streaming:
+        with zipfile.ZipFile(zip_file, "w", zipfile.ZIP_DEFLATED) as zipf:
+            converted, error_files = _convert_streaming(pending, zipf, output_dir)
+    else:
+        converted, error_files = _convert_parallel(pending, output_dir)
+        if zip_file is not None:
+            zip_files([txt_path for _, txt_path in converted], zip_file)
+
+    # 실패한 파일은 manifest에서 빼서 다음 실행 때 다시 시도
+    for folder, file_path in pending:
+        manifest.pop(file_path, None)
+    for file_path, txt_path in converted:
+        _, mtime_ns, size = found[file_path]
+        manifest[file_path] = {"txt": os.path.basename(txt_path), "mtime_ns": mtime_ns, "size": size}
+    save_manifest(manifest, manifest_path)
+
+    return {
+        "converted": [txt_path for _, txt_path in converted],
+        "skipped": skipped,
+        "removed": removed,
+        "errors": error_files,
+    }
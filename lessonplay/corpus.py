@@ -0,0 +1,198 @@
+"""배열 기반 발화 코퍼스
+
+발화를 pandas 프레임(object 문자열 한 칸마다 파이썬 객체)이 아니라 NumPy 배열 몇 개로 들고 있습니다.
+- 세션·사용자·화자는 정수 코드 배열 (이름은 sessions 표, users, speakers에 한 번씩만)
+- 메시지는 UTF-8 바이트 버퍼 하나 + 시작 위치(offsets) 배열 — i번째 메시지는 buffer[offsets[i]:offsets[i+1]]
+- 한 세션의 발화는 연속된 행 [start, stop)에 모여 있습니다.
+
+코퍼스 dict:
+    "sessions": 세션 표 (index: 세션 코드, 컬럼: 파일 경로, 수업, 날짜, 사용자, 시나리오, start, stop)
+    "users", "speakers": 코드 → 이름 (object 배열)
+    "session", "user", "speaker", "turn": 발화마다 int32
+    "offsets": int64 (발화 수 + 1), "buffer": uint8
+
+빈 화자·메시지(None)는 TXT 변환·지표 계산과 같게 'nan'으로 담습니다.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from lessonplay.ingest import summary_frame
+from lessonplay.metrics import classify_scenarios
+from lessonplay.shared_cache import get_shared
+from lessonplay.utterances import STORE_DIR, SOURCES_PATH, store_tables
+
+SESSION_COLUMNS = ["파일 경로", "수업", "날짜", "사용자", "시나리오"]
+
+
+# ---------------------------
+# ① Arrow 표 → 코퍼스
+# ---------------------------
+def _codes(column):
+    """문자열 컬럼 → (int32 코드, 이름 배열) — 코드는 처음 나온 순서"""
+    encoded = pc.dictionary_encode(column.cast(pa.string()).fill_null("nan")).combine_chunks()
+    return (encoded.indices.to_numpy(zero_copy_only=False).astype(np.int32),
+            np.asarray(encoded.dictionary.to_pylist(), dtype=object))
+
+
+def _message_buffer(column):
+    """메시지 컬럼 → (offsets int64, UTF-8 buffer uint8) — Arrow의 large_string 버퍼를 그대로 씁니다."""
+    arr = column.cast(pa.large_string()).fill_null("nan").combine_chunks()
+    if isinstance(arr, pa.ChunkedArray):
+        arr = arr.combine_chunks()
+    _, offsets_buf, data_buf = arr.buffers()
+    offsets = np.frombuffer(offsets_buf, dtype=np.int64)[arr.offset:arr.offset + len(arr) + 1]
+    data = np.frombuffer(data_buf, dtype=np.uint8) if data_buf is not None else np.empty(0, np.uint8)
+    # 잘린(slice) 배열이어도 0부터 시작하도록 맞추고, 필요한 부분만 복사해 원본 표와 떼어 냄
+    start, stop = int(offsets[0]), int(offsets[-1])
+    return offsets - start, data[start:stop].copy()
+
+
+def corpus_from_table(table: pa.Table, sessions: pd.DataFrame = None) -> dict:
+    """발화 표 (파일 경로, turn, 화자, 메시지 + 있으면 수업, 날짜, 사용자, 시나리오) → 코퍼스
+
+    sessions: 파일 경로를 index로 하는 세션 메타데이터 (없으면 표의 컬럼에서 첫 행 값을 씀)
+    """
+    session, paths = _codes(table.column("파일 경로"))
+    if len(session) and np.any(np.diff(session) < 0):
+        # 세션별로 연속되게 (같은 세션 안의 순서는 유지)
+        table = table.take(pa.array(np.argsort(session, kind="stable")))
+        session, paths = _codes(table.column("파일 경로"))
+
+    starts = np.searchsorted(session, np.arange(len(paths)), side="left")
+    stops = np.searchsorted(session, np.arange(len(paths)), side="right")
+    if sessions is None:
+        sessions = pd.DataFrame(
+            {c: np.asarray(table.column(c).cast(pa.string()).take(pa.array(starts)).to_pylist(), dtype=object)
+             for c in SESSION_COLUMNS[1:] if c in table.column_names},
+            index=paths,
+        )
+    sessions = sessions.reindex(paths).reindex(columns=SESSION_COLUMNS[1:]).fillna("")
+    sessions.insert(0, "파일 경로", paths)
+    sessions["start"], sessions["stop"] = starts, stops
+    sessions.index = pd.RangeIndex(len(paths))
+
+    user_of_session, users = pd.factorize(sessions["사용자"].astype(object))
+    speaker, speakers = _codes(table.column("화자"))
+    offsets, buffer = _message_buffer(table.column("메시지"))
+    return {
+        "sessions": sessions,
+        "users": np.asarray(users, dtype=object),
+        "speakers": speakers,
+        "session": session,
+        "user": user_of_session.astype(np.int32)[session],
+        "speaker": speaker,
+        "turn": table.column("turn").to_numpy().astype(np.int32),
+        "offsets": offsets,
+        "buffer": buffer,
+    }
+
+
+def _text(value):
+    """숫자만 있는 칸도 TXT 변환(format_lines)처럼 str()로 — 빈 칸(None)은 그대로"""
+    return None if value is None else str(value)
+
+
+def corpus_from_results(results, with_header: bool = False) -> dict:
+    """ingest(with_messages=True) 결과 → 코퍼스 (열 구조가 부족한 파일은 빠짐)
+
+    with_header: CSV 0행(헤더)도 turn 0으로 넣음 — TXT 변환처럼 파일 전체를 그대로 다시 쓸 때
+    """
+    results = [r for r in results if r["speakers"] is not None]
+    first = 0 if with_header else 1
+    lengths = [max(len(r["speakers"]) - first, 0) for r in results]
+    paths = [r["파일 경로"] for r in results]
+    table = pa.table({
+        "파일 경로": pa.array(np.repeat(np.asarray(paths, dtype=object), lengths).tolist(), pa.string()),
+        "turn": pa.array(np.concatenate([np.arange(first, first + n, dtype=np.int32) for n in lengths])
+                         if lengths else np.empty(0, np.int32)),
+        "화자": pa.array([_text(s) for r in results for s in r["speakers"][first:]], pa.string()),
+        "메시지": pa.array([_text(m) for r in results for m in r["messages"][first:]], pa.large_string()),
+    })
+
+    sessions = summary_frame(results).set_index("파일 경로")
+    # 시나리오는 세션 첫 발화(CSV 1행)로 분류 — lessonplay.metrics와 같은 규칙
+    first_messages = pd.Series({r["파일 경로"]: r["messages"][1] if len(r["messages"]) > 1 else None
+                                for r in results}, dtype=object)
+    sessions["시나리오"] = classify_scenarios(first_messages).reindex(sessions.index).fillna("")
+    return corpus_from_table(table, sessions)
+
+
+def corpus_from_store(store_dir: str = STORE_DIR, lessons=None) -> dict:
+    """발화 저장소(Parquet 파티션) → 코퍼스. pandas 프레임을 거치지 않습니다."""
+    tables = store_tables(None, lessons, store_dir)
+    if not tables:
+        return corpus_from_results([])
+    return corpus_from_table(pa.concat_tables(tables, promote_options="permissive"))
+
+
+def load_corpus(store_dir: str = STORE_DIR) -> dict:
+    """저장소 전체 코퍼스 — 저장소 기록(_sources.json)이 그대로면 프로세스 안에서 읽어 둔 것을 같이 씁니다.
+
+    여러 화면·세션이 같은 배열을 공유하므로 결과를 고치지 마세요.
+    """
+    sources_path = os.path.join(store_dir, os.path.basename(SOURCES_PATH))
+    try:
+        st_ = os.stat(sources_path)
+        version = (st_.st_mtime_ns, st_.st_size)
+    except OSError:
+        version = None
+    return get_shared(("corpus", store_dir), version, lambda: corpus_from_store(store_dir))
+
+
+# ---------------------------
+# ② 꺼내 쓰기
+# ---------------------------
+def message(corpus: dict, i: int) -> str:
+    """i번째 발화의 메시지"""
+    offsets = corpus["offsets"]
+    return corpus["buffer"][offsets[i]:offsets[i + 1]].tobytes().decode("utf-8")
+
+
+def messages(corpus: dict, start: int = 0, stop: int = None) -> list:
+    """[start, stop) 발화의 메시지 목록 — 구간을 한 번에 디코딩한 뒤 나눕니다."""
+    offsets = corpus["offsets"]
+    stop = len(offsets) - 1 if stop is None else stop
+    if stop <= start:
+        return []
+    base = int(offsets[start])
+    block = corpus["buffer"][base:offsets[stop]].tobytes()
+    cuts = (offsets[start:stop + 1] - base).tolist()
+    return [block[a:b].decode("utf-8") for a, b in zip(cuts[:-1], cuts[1:])]
+
+
+def session_code(corpus: dict, file_path: str):
+    """파일 경로 → 세션 코드 (없으면 None)"""
+    hits = np.flatnonzero(corpus["sessions"]["파일 경로"].to_numpy() == file_path)
+    return int(hits[0]) if len(hits) else None
+
+
+def session_frame(corpus: dict, code: int) -> pd.DataFrame:
+    """세션 하나의 발화 (turn, 화자, 메시지) — 화면에 보여 줄 만큼만 pandas로 만듭니다."""
+    start, stop = corpus["sessions"].loc[code, ["start", "stop"]]
+    return pd.DataFrame({
+        "turn": corpus["turn"][start:stop],
+        "화자": corpus["speakers"][corpus["speaker"][start:stop]],
+        "메시지": messages(corpus, start, stop),
+    })
+
+
+def session_lines(corpus: dict, code: int):
+    """세션 하나를 '[화자] 메시지' 줄로 (lessonplay.convert.format_lines와 같은 규칙: 둘 다 빈 행은 건너뜀)"""
+    start, stop = corpus["sessions"].loc[code, ["start", "stop"]]
+    names = corpus["speakers"][corpus["speaker"][start:stop]]
+    for s, m in zip(names, messages(corpus, start, stop)):
+        if s.strip() or m.strip():
+            yield f"[{s}] {m}"
+
+
+def corpus_nbytes(corpus: dict) -> int:
+    """코퍼스가 차지하는 메모리 (배열 + 이름 표)"""
+    arrays = sum(corpus[k].nbytes for k in ["session", "user", "speaker", "turn", "offsets", "buffer"])
+    names = int(corpus["sessions"].memory_usage(deep=True).sum())
+    names += sum(len(str(x).encode("utf-8")) + 49 for k in ["users", "speakers"] for x in corpus[k])
+    return arrays + names
+
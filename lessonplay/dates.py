@@ -0,0 +1,73 @@
+"""전사 데이터의 날짜/시간 파싱
+
+CSV 안의 '2025. 9. 11. 오후 1:03:25'(콜론)와 파일명의 '2025. 9. 11. 오후 12-05-27'(대시)를 같은 패턴으로 읽어
+('YYYY-MM-DD', 'HHMM')으로 바꿉니다. 인식하지 못하면 ('', '')입니다.
+"""
+import os
+import re
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+DATETIME_PATTERN = re.compile(
+    r"(\d{4})\.\s*(\d{1,2})\.\s*(\d{1,2})\.\s*(오전|오후)\s*(\d{1,2})[:-](\d{1,2})(?:[:-]\d{1,2})?"
+)
+
+
+def _to_24h(ampm: str, hour: int) -> int:
+    """오전 12시 → 0시, 오후 1~11시 → 13~23시"""
+    return hour % 12 + (12 if ampm == "오후" else 0)
+
+
+@lru_cache(maxsize=4096)
+def parse_korean_datetime(raw_datetime_str: str):
+    """'2025. 9. 11. 오후 1:03:25' 또는 '… 오후 12-05-27' → ('2025-09-11', '1303')
+
+    같은 파일의 발화는 타임스탬프가 몇 개뿐이라 결과를 캐시해 둡니다.
+    """
+    if not isinstance(raw_datetime_str, str):
+        return "", ""
+    m = DATETIME_PATTERN.search(raw_datetime_str)
+    if not m:
+        return "", ""
+    year, month, day, ampm, hour, minute = m.groups()
+    hour = _to_24h(ampm, int(hour))
+    return f"{int(year):04d}-{int(month):02d}-{int(day):02d}", f"{hour:02d}{int(minute):02d}"
+
+
+def parse_datetime_from_filename(filename: str):
+    """파일명에서 '2025. 9. 11. 오후 12-05-27' 형식을 인식"""
+    return parse_korean_datetime(os.path.basename(filename))
+
+
+def parse_korean_datetime_series(values: pd.Series) -> pd.DataFrame:
+    """Series 전체를 한 번에 파싱 → '날짜', '시간' 컬럼 프레임 (index 유지)
+
+    서로 다른 문자열만 정규식으로 읽고 결과를 행마다 펼칩니다.
+    """
+    codes, uniques = pd.factorize(values.astype(object).where(values.notna(), ""), sort=False)
+    uniques = pd.Series(uniques, dtype=object).astype(str)
+
+    parts = uniques.str.extract(DATETIME_PATTERN)
+    ok = parts[0].notna().to_numpy()
+    nums = parts[[0, 1, 2, 4, 5]].fillna(0).astype(int)
+    hour = nums[4] % 12 + np.where(parts[3] == "오후", 12, 0)
+
+    dates = (nums[0].astype(str).str.zfill(4) + "-" + nums[1].astype(str).str.zfill(2)
+             + "-" + nums[2].astype(str).str.zfill(2))
+    times = hour.astype(str).str.zfill(2) + nums[5].astype(str).str.zfill(2)
+    dates = np.where(ok, dates, "")
+    times = np.where(ok, times, "")
+
+    return pd.DataFrame({"날짜": dates[codes], "시간": times[codes]}, index=values.index)
+
+
+def session_datetimes(raw_datetimes: pd.Series, file_paths: pd.Series) -> pd.DataFrame:
+    """세션별 날짜/시간 (1️⃣ CSV 내부 값 → 2️⃣ 파일명 순으로 시도) — 두 Series는 같은 index"""
+    parsed = parse_korean_datetime_series(raw_datetimes)
+    missing = parsed["날짜"] == ""
+    if missing.any():
+        names = file_paths[missing].map(os.path.basename)
+        parsed.loc[missing, ["날짜", "시간"]] = parse_korean_datetime_series(names).to_numpy()
+    return parsed
@@ -0,0 +1,169 @@
+"""거의 같은 세션 찾기 (MinHash + LSH)
+
+같은 대화가 두 번 저장된 CSV(몇 초 차이로 두 번 내보낸 파일, ALL_* 묶음 파일과 학생별 파일 등)는
+입력 수·회차를 부풀립니다. 세션마다 발화 shingle의 MinHash 서명을 파싱할 때 한 번 만들어
+세션 인덱스에 넣어 두고(session_signatures), 요약 표를 만들 때 LSH로 후보 쌍만 비교합니다(find_duplicates).
+세션 수에 거의 비례하는 시간이 걸리고, 모든 쌍을 비교하지 않습니다.
+
+- shingle: 발화 하나 ('화자 + 정규화한 메시지')와 이어지는 발화 두 개의 쌍
+- 서명: NUM_PERM개의 해시 함수별 최솟값 (uint32) → bytes로 저장
+- LSH: 서명을 BANDS개 띠로 나눠 한 띠라도 같으면 후보, 서명 일치 비율(추정 Jaccard)이 DUPLICATE_THRESHOLD 이상이면 중복
+"""
+import numpy as np
+import pandas as pd
+
+NUM_PERM = 64
+BANDS = 16  # 띠 하나에 NUM_PERM // BANDS = 4개 → 유사도 0.5 근처부터 후보가 됨
+DUPLICATE_THRESHOLD = 0.8
+
+# 묶음 내보내기 사용자 — 같은 대화가 학생별 파일에도 있으면 학생 쪽을 원본으로 남김
+AGGREGATE_USERS = {"ALL"}
+
+_PRIME = np.uint64((1 << 31) - 1)
+_rng = np.random.default_rng(20251125)  # 서명을 인덱스에 저장하므로 해시 함수는 고정
+_A = _rng.integers(1, int(_PRIME), NUM_PERM, dtype=np.uint64)
+_B = _rng.integers(0, int(_PRIME), NUM_PERM, dtype=np.uint64)
+
+# 한 번에 (NUM_PERM × 이 수)만큼만 해시를 계산 (메모리 상한)
+_CHUNK_SHINGLES = 1 << 16
+
+
+def _shingle_hashes(utterances: pd.DataFrame):
+    """발화 프레임 → (세션 코드별 정렬된 shingle 해시, 세션 코드, 세션 이름)"""
+    sessions = utterances["파일 경로"].astype("category")
+    codes = sessions.cat.codes.to_numpy()
+    speakers = utterances["화자"].astype(object).where(utterances["화자"].notna(), "nan").astype(str)
+    messages = utterances["메시지"].astype(object).where(utterances["메시지"].notna(), "nan").astype(str)
+    # 띄어쓰기·대소문자 차이는 같은 발화로 봄
+    tokens = (speakers + "\x1f" + messages.str.replace(r"\s+", "", regex=True).str.lower()).to_numpy(dtype=object)
+    h = pd.util.hash_array(tokens)
+
+    # 같은 세션 안에서 이어지는 두 발화의 쌍 (순서 정보)
+    same = np.r_[codes[1:] == codes[:-1], False]
+    pair = pd.util.hash_array(h[:-1] * np.uint64(0x9E3779B97F4A7C15) ^ h[1:]) if len(h) > 1 else h[:0]
+    all_h = np.r_[h, pair[same[:-1]]]
+    all_codes = np.r_[codes, codes[:-1][same[:-1]]]
+
+    order = np.argsort(all_codes, kind="stable")
+    return (all_h[order] & _PRIME).astype(np.uint64), all_codes[order], sessions.cat.categories
+
+
+def session_signatures(utterances: pd.DataFrame) -> pd.Series:
+    """발화 프레임('파일 경로', '화자', '메시지') → {파일 경로: MinHash 서명 bytes} (발화가 없는 세션은 빠짐)"""
+    if utterances.empty:
+        return pd.Series(dtype=object, index=pd.Index([], name="파일 경로"))
+    h, codes, names = _shingle_hashes(utterances)
+    n = len(names)
+    sig = np.full((n, NUM_PERM), np.iinfo(np.uint32).max, dtype=np.uint32)
+    for start in range(0, len(h), _CHUNK_SHINGLES):
+        part = h[start:start + _CHUNK_SHINGLES]
+        part_codes = codes[start:start + _CHUNK_SHINGLES]
+        values = ((_A[:, None] * part[None, :] + _B[:, None]) % _PRIME).astype(np.uint32)
+        # 세션 코드가 정렬돼 있으므로 세션별 최솟값은 reduceat 한 번
+        bounds = np.flatnonzero(np.r_[True, part_codes[1:] != part_codes[:-1]])
+        chunk_min = np.minimum.reduceat(values, bounds, axis=1).T
+        rows = part_codes[bounds]
+        sig[rows] = np.minimum(sig[rows], chunk_min)
+    present = np.bincount(codes, minlength=n) > 0
+    return pd.Series([row.tobytes() for row in sig[present]],
+                     index=pd.Index(np.asarray(names, dtype=object)[present], name="파일 경로"), dtype=object)
+
+
+def _buckets(keys: np.ndarray):
+    """같은 키를 가진 위치끼리 묶은 배열들 (두 개 이상인 것만, 위치 오름차순)"""
+    order = np.argsort(keys, kind="stable")
+    sorted_keys = keys[order]
+    starts = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]])
+    sizes = np.diff(np.r_[starts, len(order)])
+    for start, size in zip(starts[sizes > 1], sizes[sizes > 1]):
+        yield np.sort(order[start:start + size])
+
+
+def find_duplicates(index_df: pd.DataFrame, threshold: float = DUPLICATE_THRESHOLD) -> pd.DataFrame:
+    """세션 인덱스('minhash' 컬럼) → 중복 세션 표 (index: 파일 경로, 컬럼: 중복 원본, 유사도)
+
+    비슷한 세션끼리 묶은 뒤, 묶음마다 원본 하나를 남기고 나머지 행만 돌려줍니다. 중복이 없으면 빈 표.
+    """
+    empty = pd.DataFrame({"중복 원본": pd.Series(dtype=object), "유사도": pd.Series(dtype=float)},
+                         index=pd.Index([], name="파일 경로"))
+    if "minhash" not in index_df or index_df.empty:
+        return empty
+    # 원본 우선순위: 묶음 사용자가 아닌 쪽 → 입력 수가 많은 쪽 (중간에 저장된 짧은 사본보다 완성본) → 빠른 쪽
+    rows = index_df[index_df["minhash"].notna()].sort_values(
+        ["사용자", "입력 수", "날짜", "시간", "파일 경로"],
+        ascending=[True, False, True, True, True],
+        key=lambda s: s.isin(AGGREGATE_USERS) if s.name == "사용자" else s,
+        kind="stable",
+    ).reset_index(drop=True)
+    if len(rows) < 2:
+        return empty
+    sig = np.frombuffer(b"".join(rows["minhash"]), dtype=np.uint32).reshape(len(rows), NUM_PERM)
+
+    # ① LSH: 띠마다 값이 같은 세션끼리 후보 쌍 — 띠 해시로 정렬해서 같은 통(bucket) 안에서만 짝지음.
+    #    통은 (수업, 날짜, 사용자)별로 나눠서, 대본이 같은 다른 학생 세션이 한 통에 몰려 쌍이 폭증하지 않게 합니다.
+    #    (다른 날의 세션은 발화가 같아도 AI 피드백이 다른 별개의 세션이므로 같은 통에 넣지 않음)
+    #    묶음 사용자 세션은 따로 (수업, 날짜)별 통에서 학생 세션과만 짝지음.
+    users = rows["사용자"].to_numpy(dtype=object)
+    days = (rows["수업"].astype(str) + "\x1f" + rows["날짜"].astype(str)).to_numpy(dtype=object)
+    aggregate = rows["사용자"].isin(AGGREGATE_USERS).to_numpy()
+    user_key = pd.util.hash_array((days + "\x1f" + rows["사용자"].astype(str).to_numpy(dtype=object)).astype(object))
+    day_key = pd.util.hash_array(days)
+    rows_per_band = NUM_PERM // BANDS
+    candidates = set()
+    for b in range(BANDS):
+        band = sig[:, b * rows_per_band:(b + 1) * rows_per_band].astype(np.uint64)
+        keys = np.zeros(len(rows), dtype=np.uint64)
+        for k in range(rows_per_band):
+            keys = pd.util.hash_array(keys ^ band[:, k])
+        for bucket in _buckets(pd.util.hash_array(keys ^ user_key)):
+            candidates.update((int(i), int(j)) for k, i in enumerate(bucket) for j in bucket[k + 1:])
+        if aggregate.any():
+            for bucket in _buckets(pd.util.hash_array(keys ^ day_key)):
+                aggs, students = bucket[aggregate[bucket]], bucket[~aggregate[bucket]]
+                candidates.update((int(min(i, j)), int(max(i, j))) for i in aggs for j in students)
+
+    # ② 후보 쌍만 서명 일치 비율로 확인 → union-find로 묶음 (앞 순서 = 원본이 대표)
+    #    같은 수업·같은 날짜에서, 같은 사용자끼리 또는 묶음 사용자와 다른 사용자 사이만 중복으로 봅니다.
+    #    (도입 발화만 있는 세션처럼 대본이 같은 다른 학생의 세션은 중복이 아님)
+    parent = list(range(len(rows)))
+
+    def root(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    similarity = np.zeros(len(rows))
+    if candidates:
+        pairs = np.array(sorted(candidates))
+        sims = (sig[pairs[:, 0]] == sig[pairs[:, 1]]).mean(axis=1)
+        i, j = pairs[:, 0], pairs[:, 1]
+        ok = (sims >= threshold) & (days[i] == days[j])
+        same_kind = ok & (users[i] == users[j])
+        # 같은 사용자끼리 먼저 묶고 (묶음 사용자끼리도 포함)
+        for a, b, s in zip(i[same_kind], j[same_kind], sims[same_kind]):
+            ra, rb = root(a), root(b)
+            if ra != rb:
+                parent[max(ra, rb)] = min(ra, rb)
+            similarity[b] = max(similarity[b], s)
+        # 묶음 사용자 세션은 가장 비슷한 학생 세션 하나에만 붙임 (학생끼리는 묶이지 않게)
+        cross = ok & (aggregate[i] != aggregate[j])
+        best = {}
+        for a, b, s in zip(i[cross], j[cross], sims[cross]):
+            agg, student = (b, a) if aggregate[b] else (a, b)
+            if s > best.get(agg, (0, None))[0]:
+                best[agg] = (s, student)
+        for agg, (s, student) in sorted(best.items()):
+            ra = root(agg)
+            if aggregate[ra]:
+                parent[ra] = root(student)
+            similarity[agg] = max(similarity[agg], s)
+
+    reps = np.array([root(i) for i in range(len(rows))])
+    dup = np.flatnonzero(reps != np.arange(len(rows)))
+    if not len(dup):
+        return empty
+    return pd.DataFrame({
+        "중복 원본": rows["파일 경로"].to_numpy()[reps[dup]],
+        "유사도": np.round(similarity[dup], 3),
+    }, index=pd.Index(rows["파일 경로"].to_numpy()[dup], name="파일 경로"))
@@ -0,0 +1,35 @@
+"""요약 표 내보내기
+
+표를 파일 형식별 바이트로 바꿉니다. 화면에서는 사용자가 요청할 때만 부르고 결과를 캐시합니다.
+"""
+import io
+
+import pandas as pd
+
+# {형식 이름: (파일 확장자, MIME)}
+EXPORT_FORMATS = {
+    "CSV (utf-8-sig)": (".csv", "text/csv"),
+    "CSV (gzip 압축)": (".csv.gz", "application/gzip"),
+    "Parquet": (".parquet", "application/octet-stream"),
+}
+
+
+def export_bytes(df: pd.DataFrame, fmt: str) -> bytes:
+    """df → fmt 형식의 파일 내용 (fmt는 EXPORT_FORMATS의 키)"""
+    buffer = io.BytesIO()
+    if fmt == "CSV (utf-8-sig)":
+        df.to_csv(buffer, index=False, encoding="utf-8-sig")
+    elif fmt == "CSV (gzip 압축)":
+        # 압축을 풀면 위 CSV와 같은 내용 (엑셀용 BOM 포함)
+        df.to_csv(buffer, index=False, encoding="utf-8-sig",
+                  compression={"method": "gzip", "mtime": 0})
+    elif fmt == "Parquet":
+        df.to_parquet(buffer, index=False)
+    else:
+        raise ValueError(f"알 수 없는 내보내기 형식: {fmt}")
+    return buffer.getvalue()
+
+
+def export_file_name(stem: str, fmt: str) -> str:
+    """'summary' + 형식 → 'summary.csv.gz' 같은 파일명"""
+    return stem + EXPORT_FORMATS[fmt][0]
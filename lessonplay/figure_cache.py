@@ -0,0 +1,74 @@
+"""Plotly 그림 캐시
+
+(입력 파일 내용 해시, 그림 함수 이름, 파라미터)마다 완성된 그림을 JSON으로 보관합니다.
+같은 학생을 다시 볼 때는 CSV 읽기·집계·그림 생성 없이 JSON에서 그림을 되살립니다.
+프로세스 안의 모든 세션이 공유하며, 개수가 넘치면 가장 오래 안 쓴 그림부터 버립니다 (LRU).
+"""
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+FIGURE_CACHE_SIZE = 32
+
+_figures = OrderedDict()
+_digests = {}
+_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+
+def file_digest(path: str) -> str:
+    """파일 내용의 BLAKE2b 해시 — 같은 (mtime, 크기)면 다시 읽지 않고 지난번 값을 씁니다."""
+    st_ = os.stat(path)
+    version = (st_.st_mtime_ns, st_.st_size)
+    with _lock:
+        cached = _digests.get(path)
+        if cached and cached[0] == version:
+            return cached[1]
+
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    digest = h.hexdigest()
+
+    with _lock:
+        _digests[path] = (version, digest)
+    return digest
+
+
+def cached_figure(digest: str, plot_name: str, build, params=()):
+    """캐시에 있으면 그림을 되살리고, 없으면 build()로 만들어 넣습니다.
+
+    build: 인자 없이 부르는 함수 — go.Figure 또는 그릴 것이 없으면 None을 반환
+    (None도 캐시하므로 빈 결과도 다시 계산하지 않음). build()에서 난 예외는 캐시하지 않고 그대로 올립니다.
+    """
+    key = (digest, plot_name, tuple(params))
+    with _lock:
+        if key in _figures:
+            _figures.move_to_end(key)
+            _stats["hits"] += 1
+            fig_json = _figures[key]
+            hit = True
+        else:
+            _stats["misses"] += 1
+            hit = False
+    if hit:
+        import plotly.io as pio
+
+        return None if fig_json is None else pio.from_json(fig_json)
+
+    fig = build()
+    with _lock:
+        _figures[key] = None if fig is None else fig.to_json()
+        _figures.move_to_end(key)
+        while len(_figures) > FIGURE_CACHE_SIZE:
+            _figures.popitem(last=False)
+            _stats["evictions"] += 1
+    return fig
+
+
+def cache_stats() -> dict:
+    """{"hits", "misses", "evictions", "entries", "max_entries"}"""
+    with _lock:
+        return {**_stats, "entries": len(_figures), "max_entries": FIGURE_CACHE_SIZE}
@@ -0,0 +1,54 @@
+"""요약 표 필터 엔진
+
+데이터 버전마다 한 번, 컬럼별로 {값: 해당 행 위치 배열} 인덱스를 만들어 둡니다.
+필터 조합은 이 위치 배열들의 교집합으로 답하므로, 선택을 바꿀 때 전체 표를 복사하거나 마스크를 만들지 않습니다.
+"""
+import numpy as np
+import pandas as pd
+
+
+def _positions_by_value(values: pd.Series) -> dict:
+    """{값: 오름차순 행 위치 배열}"""
+    codes, uniques = pd.factorize(values, sort=False)
+    order = np.argsort(codes, kind="stable")
+    counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+    groups = np.split(order[codes[order] >= 0], np.cumsum(counts)[:-1]) if len(uniques) else []
+    return dict(zip(uniques.tolist(), groups))
+
+
+def build_filter_index(df: pd.DataFrame, columns, flags=None) -> dict:
+    """필터 인덱스를 만듭니다.
+
+    columns: 선택 상자로 거를 컬럼 목록 (예: ["수업", "시나리오", "사용자"])
+    flags: {이름: 불리언 Series} — 체크박스처럼 켜고 끄는 조건 (예: {"입력 있음": df["입력 수"] > 0})
+    반환 dict: {"n_rows", "values": {컬럼: {값: 위치}}, "options": {컬럼: 정렬된 값 목록}, "flags": {이름: 위치}}
+    """
+    values = {col: _positions_by_value(df[col]) for col in columns}
+    return {
+        "n_rows": len(df),
+        "values": values,
+        "options": {col: sorted(v) for col, v in values.items()},
+        "flags": {name: np.flatnonzero(mask.to_numpy(dtype=bool)) for name, mask in (flags or {}).items()},
+    }
+
+
+def select_positions(filter_index: dict, selections: dict, flags=()) -> np.ndarray:
+    """선택 조건에 맞는 행 위치(오름차순)를 반환합니다.
+
+    selections: {컬럼: 값} — 값이 None이면 그 컬럼은 거르지 않음
+    flags: 함께 적용할 flag 이름들
+    """
+    candidates = [filter_index["values"][col].get(value, np.empty(0, dtype=np.intp))
+                  for col, value in selections.items() if value is not None]
+    candidates += [filter_index["flags"][name] for name in flags]
+    if not candidates:
+        return np.arange(filter_index["n_rows"])
+
+    # 가장 짧은 배열부터 교집합
+    candidates.sort(key=len)
+    positions = candidates[0]
+    for other in candidates[1:]:
+        if not len(positions):
+            break
+        positions = np.intersect1d(positions, other, assume_unique=True)
+    return positions
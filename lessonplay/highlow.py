@@ -0,0 +1,95 @@
+"""highlow.csv 매칭
+
+highlow.csv의 Filename과 세션 CSV 파일명을 같은 규칙으로 정규화해서 {키: (High, Low)} dict로 맞춥니다.
+dict는 highlow.csv의 (mtime, 크기)가 바뀔 때만 다시 만듭니다.
+"""
+import os
+import re
+import unicodedata
+from functools import lru_cache
+
+import pandas as pd
+
+from lessonplay.shared_cache import get_shared
+from lessonplay.timing import stage
+
+HIGHLOW_PATH = os.path.join("data", "highlow.csv")
+
+# 파일명 끝에서 떼어낼 확장자 — '2025. 9. 11. 오후 12-05-27'처럼 점이 들어간 이름을
+# os.path.splitext로 자르면 '. 오후 12-05-27'까지 확장자로 잘려 나가므로 알려진 확장자만 뗍니다.
+_EXTENSION_RE = re.compile(r"\.(csv|txt)$", re.IGNORECASE)
+_SPACE_RE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=65536)
+def normalize_filename(name: str) -> str:
+    """파일명 정규화: 경로·확장자 제거 + 유니코드 NFC + 공백 정리 + 오전/오후 표준화"""
+    s = unicodedata.normalize("NFC", os.path.basename(str(name).strip()))
+    s = _EXTENSION_RE.sub("", s)
+    s = _SPACE_RE.sub(" ", s).strip()
+    s = s.replace("AM", "오전").replace("PM", "오후")
+    return s
+
+
+def highlow_version(path: str = HIGHLOW_PATH):
+    """highlow.csv의 (mtime_ns, 크기) — 파일이 없으면 None"""
+    try:
+        st_ = os.stat(path)
+    except OSError:
+        return None
+    return st_.st_mtime_ns, st_.st_size
+
+
+def load_highlow(path: str = HIGHLOW_PATH):
+    """highlow.csv → ({정규화 키: (High, Low)}, 중복 키 목록). 파일이 없으면 None.
+
+    같은 (경로, mtime, 크기)면 프로세스 안에서 만들어 둔 dict를 그대로 돌려줍니다.
+    """
+    version = highlow_version(path)
+    if version is None:
+        return None
+    return get_shared(("highlow", path), version, lambda: _read_highlow(path))
+
+
+def _read_highlow(path: str):
+    highlow_df = pd.read_csv(path)
+    keys = highlow_df["Filename"].map(normalize_filename)
+    duplicated = sorted(set(keys[keys.duplicated()]))
+    # 같은 키가 여러 번 나오면 첫 행을 씁니다 (merge처럼 세션 행이 불어나지 않게)
+    first = ~keys.duplicated()
+    lookup = dict(zip(
+        keys[first],
+        zip(highlow_df.loc[first, "High"].fillna(0).astype(int), highlow_df.loc[first, "Low"].fillna(0).astype(int)),
+    ))
+    return lookup, duplicated
+
+
+def attach_highlow(df: pd.DataFrame, path: str = HIGHLOW_PATH):
+    """df의 '파일 경로'마다 High/Low를 dict에서 찾아 붙입니다.
+
+    반환값: (df, report) — highlow.csv가 없으면 (df, None)
+    report: {"unmatched_sessions": 짝이 없는 세션 키, "unmatched_highlow": 세션이 없는 highlow 키,
+             "duplicated": highlow.csv 안에서 중복된 키}
+    짝이 없는 세션의 High/Low는 0입니다.
+    """
+    with stage("highlow.csv 읽기"):
+        loaded = load_highlow(path)
+    if loaded is None:
+        return df, None
+    lookup, duplicated = loaded
+
+    with stage("highlow 매칭", rows=len(df)):
+        keys = [normalize_filename(p) for p in df["파일 경로"]]
+        values = [lookup.get(k) for k in keys]
+        df = df.assign(
+            High=[v[0] if v else 0 for v in values],
+            Low=[v[1] if v else 0 for v in values],
+        )
+
+    key_set = set(keys)
+    report = {
+        "unmatched_sessions": sorted(k for k, v in zip(keys, values) if v is None),
+        "unmatched_highlow": sorted(k for k in lookup if k not in key_set),
+        "duplicated": duplicated,
+    }
+    return df, report
@@ -0,0 +1,163 @@
+"""전사 CSV 수집·파싱 공통 모듈
+
+요약 페이지(세션 인덱스)와 CSV → TXT 변환 페이지가 같은 방식으로 파일을 찾고 읽도록 모아 둔 곳입니다.
+파일이 많으면 프로세스 풀에서 병렬로 파싱합니다.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from lessonplay.dates import session_datetimes
+
+BASE_DIR = "data"
+FOLDERS = ["Rehearsal", "TeachingMethod"]
+
+# 이보다 적으면 프로세스를 띄우는 비용이 더 커서 그냥 순서대로 읽습니다.
+PARALLEL_MIN_FILES = 32
+
+
+# ---------------------------
+# ① 파일 찾기
+# ---------------------------
+def find_transcripts(base_dir: str = BASE_DIR, folders=FOLDERS) -> list:
+    """[(폴더, 파일 경로)] — data/<폴더> 아래의 모든 CSV"""
+    found = []
+    for folder in folders:
+        root_path = os.path.join(base_dir, folder)
+        if not os.path.exists(root_path):
+            continue
+        for root, dirs, files in os.walk(root_path):
+            for file in files:
+                if file.endswith(".csv"):
+                    found.append((folder, os.path.join(root, file)))
+    return found
+
+
+def scan_files(base_dir: str = BASE_DIR, folders=FOLDERS) -> dict:
+    """{파일 경로: (폴더, mtime_ns, 크기)} — 파일 내용은 읽지 않고 stat만 합니다."""
+    found = {}
+    for folder, file_path in find_transcripts(base_dir, folders):
+        try:
+            st_ = os.stat(file_path)
+        except OSError:
+            continue  # 스캔 도중 지워진 파일
+        found[file_path] = (folder, st_.st_mtime_ns, st_.st_size)
+    return found
+
+
+def rescan_paths(found: dict, paths, base_dir: str = BASE_DIR, folders=FOLDERS) -> dict:
+    """scan_files() 결과에서 paths만 다시 stat한 사본 — 사라진 파일은 빠지고, 새 파일은 들어갑니다.
+
+    파일 감시기처럼 바뀐 파일을 이미 알고 있을 때 폴더 전체를 다시 훑지 않으려고 씁니다.
+    """
+    found = dict(found)
+    for file_path in paths:
+        rel = os.path.relpath(file_path, base_dir).split(os.sep)
+        if len(rel) < 2 or rel[0] not in folders or not file_path.endswith(".csv"):
+            continue
+        try:
+            st_ = os.stat(file_path)
+        except OSError:
+            found.pop(file_path, None)
+            continue
+        found[file_path] = (rel[0], st_.st_mtime_ns, st_.st_size)
+    return found
+
+
+# ---------------------------
+# ② 파일 1개 파싱
+# ---------------------------
+def summarize_frame(df: pd.DataFrame, file_path: str, folder: str) -> dict:
+    """header=None으로 읽은 전사 CSV 프레임에서 세션 메타데이터(dict)를 만듭니다.
+
+    날짜/시간은 원본 문자열만 담아 두고 summary_frame()에서 여러 세션을 한 번에 파싱합니다.
+    시나리오와 입력 수 / 발문 수 / 설명 수는 lessonplay.metrics.session_metrics()에서 한 번에 계산합니다.
+    """
+    # 수업 구분
+    lesson_type = "Rehearsal" if "Rehearsal" in folder else "TeachingMethod"
+
+    # 날짜/시간 원본 (B2 셀)
+    raw_datetime = str(df.iloc[1, 1]) if (len(df.columns) > 1 and len(df) > 1) else ""
+
+    # 사용자
+    user = str(df.iloc[1, 0]) if len(df) > 1 else ""
+
+    # 피드백 유무
+    has_feedback = 1 if (df.shape[1] > 4 and "AI 피드백" in str(df.iloc[0, 4])) else 0
+
+    return {
+        "수업": lesson_type,
+        "날짜/시간": raw_datetime,
+        "사용자": user,
+        "피드백 유무": has_feedback,
+        "파일 경로": file_path,
+    }
+
+
+def summary_frame(results) -> pd.DataFrame:
+    """ingest() 결과들의 메타데이터 → 프레임. 날짜·시간·session_id를 한 번에 채웁니다."""
+    df = pd.DataFrame(
+        [r["summary"] for r in results],
+        columns=["수업", "날짜/시간", "사용자", "피드백 유무", "파일 경로"],
+    )
+    # 날짜/시간 (1️⃣ CSV 내부 → 2️⃣ 파일명 순으로 시도)
+    df[["날짜", "시간"]] = session_datetimes(df["날짜/시간"], df["파일 경로"])
+    # 회차 ID
+    df["session_id"] = df["사용자"] + "_" + df["날짜"]
+    return df.drop(columns=["날짜/시간"])
+
+
+def parse_transcript(file_path: str, folder: str, with_messages: bool = False) -> dict:
+    """CSV 1개를 읽어 결과 dict를 반환합니다. 읽기 오류는 그대로 올립니다.
+
+    반환 dict:
+    - "파일 경로", "summary": summarize_frame() 결과
+    - "speakers", "messages": with_messages=True일 때 화자열(index 2)·메시지열(index 3) 리스트
+      (0번은 헤더 행, 빈 칸은 None). 열이 4개보다 적으면 None
+    """
+    df = pd.read_csv(file_path, header=None)
+    result = {"파일 경로": file_path, "summary": summarize_frame(df, file_path, folder)}
+    if with_messages:
+        if df.shape[1] < 4:
+            result["speakers"] = result["messages"] = None
+        else:
+            cols = df.iloc[:, [2, 3]].astype(object)
+            cols = cols.where(cols.notna(), None)
+            result["speakers"] = cols.iloc[:, 0].tolist()
+            result["messages"] = cols.iloc[:, 1].tolist()
+    return result
+
+
+def _parse_one(args):
+    """프로세스 풀 작업 단위: 예외를 오류 dict로 바꿔서 돌려줍니다."""
+    folder, file_path, with_messages = args
+    try:
+        return parse_transcript(file_path, folder, with_messages), None
+    except Exception as e:
+        return None, {"파일 경로": file_path, "파일명": os.path.basename(file_path), "오류": str(e)}
+
+
+# ---------------------------
+# ③ 여러 파일 파싱
+# ---------------------------
+def ingest(items, with_messages: bool = False, max_workers=None):
+    """[(폴더, 파일 경로)]를 파싱해서 (results, errors)를 반환합니다.
+
+    - results: parse_transcript() 결과 리스트 (입력 순서 유지, 실패한 파일 제외)
+    - errors: [{"파일 경로", "파일명", "오류"}]
+    파일 수가 PARALLEL_MIN_FILES 이상이면 CPU 코어 수만큼 프로세스를 띄워 나눠 읽습니다.
+    """
+    jobs = [(folder, file_path, with_messages) for folder, file_path in items]
+    workers = max_workers or os.cpu_count() or 1
+
+    if workers > 1 and len(jobs) >= PARALLEL_MIN_FILES:
+        chunksize = max(1, len(jobs) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            outcomes = list(pool.map(_parse_one, jobs, chunksize=chunksize))
+    else:
+        outcomes = [_parse_one(job) for job in jobs]
+
+    results = [r for r, _ in outcomes if r is not None]
+    errors = [e for _, e in outcomes if e is not None]
+    return results, errors
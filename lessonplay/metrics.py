@@ -0,0 +1,64 @@
+"""세션별 지표 일괄 계산
+
+모든 세션의 발화를 한 프레임(lessonplay.utterances 형식)으로 모아 두고, 시나리오 분류와
+입력 수 / 발문 수 / 설명 수를 파일별 반복 없이 한 번에 계산합니다.
+"""
+import numpy as np
+import pandas as pd
+
+# 약수 시나리오는 CSV 8행(turn 8)부터 셉니다 — 그 앞은 도입부 대화
+YAKSU_START_TURN = 8
+
+METRIC_COLUMNS = ["시나리오", "입력 수", "발문 수", "설명 수"]
+
+
+def classify_scenarios(first_messages: pd.Series) -> pd.Series:
+    """세션 첫 발화(CSV 1행 메시지)로 시나리오를 분류합니다: '120의 약수…' → 약수, '선생님,…' → 명제"""
+    s = first_messages.astype(object).where(first_messages.notna(), "").astype(str)
+    scenario = np.where(s.str.startswith("120의 약수"), "약수",
+                        np.where(s.str.startswith("선생님,"), "명제", ""))
+    return pd.Series(scenario, index=first_messages.index, dtype=object)
+
+
+def session_scenarios(utterances: pd.DataFrame) -> pd.Series:
+    """{파일 경로: 시나리오} — 첫 발화(turn 1)가 없는 세션은 ''"""
+    first = utterances.loc[utterances["turn"] == 1, ["파일 경로", "메시지"]]
+    scenarios = classify_scenarios(first.set_index(first["파일 경로"].astype(object))["메시지"])
+    return scenarios[~scenarios.index.duplicated()]
+
+
+def session_metrics(utterances: pd.DataFrame) -> pd.DataFrame:
+    """발화 프레임 → 파일 경로별 시나리오·입력 수·발문 수·설명 수 (index: 파일 경로)
+
+    utterances에는 '파일 경로', 'turn', '화자', '메시지' 컬럼이 있어야 합니다.
+    """
+    if utterances.empty:
+        return pd.DataFrame(columns=METRIC_COLUMNS, index=pd.Index([], name="파일 경로"))
+
+    sessions = utterances["파일 경로"].astype("category")
+    codes = sessions.cat.codes.to_numpy()
+    n_sessions = len(sessions.cat.categories)
+    session_index = pd.Index(sessions.cat.categories.astype(object), name="파일 경로")
+
+    # 세션별 시나리오를 행마다 펼치기
+    scenarios = session_scenarios(utterances).reindex(session_index, fill_value="")
+    row_scenario = scenarios.to_numpy()[codes]
+
+    # 교사 발화 중 (명제: 전부, 약수: turn 8 이후)만 센다
+    is_teacher = (utterances["화자"].astype(object) == "교사").to_numpy()
+    turns = utterances["turn"].to_numpy()
+    counted = is_teacher & (
+        (row_scenario == "명제") | ((row_scenario == "약수") & (turns >= YAKSU_START_TURN))
+    )
+    messages = utterances["메시지"].astype(object).where(utterances["메시지"].notna(), "nan").astype(str)
+    is_question = counted & messages.str.endswith("?").to_numpy()
+
+    input_count = np.bincount(codes, weights=counted, minlength=n_sessions).astype(int)
+    question_count = np.bincount(codes, weights=is_question, minlength=n_sessions).astype(int)
+
+    return pd.DataFrame({
+        "시나리오": scenarios.to_numpy(),
+        "입력 수": input_count,
+        "발문 수": question_count,
+        "설명 수": input_count - question_count,
+    }, index=session_index)
@@ -0,0 +1,167 @@
+"""분석 그래프 (Plotly)
+
+코딩 CSV 집계(lessonplay.coding.aggregate_coded) 결과로 세 가지 그래프를 만듭니다.
+분석 페이지와 일괄 보고서(lessonplay.report)가 함께 씁니다.
+plotly는 그래프를 실제로 만들 때 불러옵니다 (그림 캐시에 있으면 이 모듈의 함수를 부르지 않음).
+"""
+import pandas as pd
+
+
+def plot_summary(summary: pd.DataFrame):
+    import plotly.graph_objects as go
+
+    # Plotly로 그리기
+    x = summary['session_label'].tolist()
+
+    colors = {
+        'High': '#4DA6FF',
+        'Low': '#FF6666',
+        'Total': '#66CC66'
+    }
+
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        x=x,
+        y=summary['high'],
+        mode='lines+markers',
+        name='High',
+        line=dict(color=colors['High'], width=3),
+        marker=dict(size=8)
+    ))
+    fig.add_trace(go.Scatter(
+        x=x,
+        y=summary['low'],
+        mode='lines+markers',
+        name='Low',
+        line=dict(color=colors['Low'], width=3),
+        marker=dict(size=8)
+    ))
+    fig.add_trace(go.Scatter(
+        x=x,
+        y=summary['total'],
+        mode='lines+markers',
+        name='Total',
+        line=dict(color=colors['Total'], width=3, dash='dot'),
+        marker=dict(size=8)
+    ))
+
+    fig.update_layout(
+        title='날짜-회차별 High / Low / Total 발화 수 추이',
+        xaxis_title='날짜 #회차',
+        yaxis_title='발화 수',
+        xaxis=dict(tickangle=-45),
+        legend=dict(orientation='h', yanchor='bottom', y=1.02, xanchor='right', x=1),
+        margin=dict(l=40, r=20, t=70, b=120),
+        template='plotly_white'
+    )
+
+    # 한글 폰트: 브라우저에서 로드되는 폰트를 사용하도록 family 지정 (Noto Sans KR 사용 권장)
+    fig.update_layout(font=dict(family='Noto Sans KR, sans-serif', size=12))
+
+    return fig
+
+
+def plot_tmssr_proportions(pivot_df: pd.DataFrame):
+    """100% 스택형 막대(세션별 TMSSR 비율)를 Plotly로 생성해서 반환합니다."""
+    import plotly.graph_objects as go
+
+    # TMSSR 카테고리 열 목록 (index 컬럼 제외)
+    value_cols = [c for c in pivot_df.columns if c not in ('날짜', '회차', 'total_count', 'session_label')]
+    labels = pivot_df['session_label'].tolist()
+
+    fig = go.Figure()
+    # 누적 스택을 위해 각 카테고리의 비율(0..1)을 계산
+    totals = pivot_df['total_count'].replace(0, 1)  # 0으로 나누는 것을 방지
+    for col in value_cols:
+        vals = pivot_df[col].astype(float).fillna(0.0)
+        frac = (vals / totals).tolist()
+        # hover에 원래 개수도 표시
+        hover = [f'{col}<br>{lbl}<br>count: {int(c)}<br>pct: {p:.1%}' for lbl, c, p in zip(labels, vals, frac)]
+        fig.add_trace(go.Bar(
+            x=labels,
+            y=frac,
+            name=col,
+            hovertext=hover,
+            hoverinfo='text'
+        ))
+
+    fig.update_layout(
+        barmode='stack',
+        title='세션별 TMSSR 비율 (100% 스택)',
+        xaxis_title='날짜 #회차',
+        yaxis_title='비율',
+        yaxis=dict(tickformat='.0%'),
+        margin=dict(l=40, r=20, t=70, b=120),
+        template='plotly_white',
+        legend=dict(orientation='h', yanchor='bottom', y=1.02, xanchor='right', x=1)
+    )
+    # 한글 폰트 적용
+    fig.update_layout(font=dict(family='Noto Sans KR, sans-serif', size=12))
+    return fig
+
+
+def plot_tmssr_potential_trends(pivot_df: pd.DataFrame, labels: list):
+    """각 TMSSR 범주별로 High/Low의 변화(세션 순서)를 막대 그래프로 표시.
+
+    pivot_df: index가 (날짜, 회차)인 피벗 테이블
+    labels: 각 인덱스에 대응하는 x축 레이블 리스트
+    """
+    import plotly.graph_objects as go
+
+    # TMSSR 카테고리 목록 추출 (멀티컬럼 형태에서 추출)
+    col_tuples = [c for c in pivot_df.columns if isinstance(c, tuple) and len(c) == 2]
+    tmssr_cats = sorted({t[0] for t in col_tuples})
+
+    # 색상 팔레트 (High, Low 쌍)
+    high_palette = ['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd', '#8c564b', '#e377c2']
+    low_palette =  ['#17becf', '#ffbb78', '#98df8a', '#ff9896', '#c5b0d5', '#c49c94', '#f7b6d2']
+
+    fig = go.Figure()
+    for i, cat in enumerate(tmssr_cats):
+        color_h = high_palette[i % len(high_palette)]
+        color_l = low_palette[i % len(low_palette)]
+
+        # High bar
+        col_high = (cat, 'High')
+        if col_high in pivot_df.columns:
+            y_high = pivot_df[col_high].astype(float).fillna(0).tolist()
+        else:
+            y_high = [0] * len(labels)
+        fig.add_trace(go.Bar(
+            x=labels,
+            y=y_high,
+            name=f'{cat} - High',
+            marker=dict(color=color_h),
+            offsetgroup=f'{cat}_high',
+            legendgroup=cat,
+            hovertemplate=f'{cat} - High<br>%{{x}}<br>count: %{{y}}<extra></extra>'
+        ))
+
+        # Low bar
+        col_low = (cat, 'Low')
+        if col_low in pivot_df.columns:
+            y_low = pivot_df[col_low].astype(float).fillna(0).tolist()
+        else:
+            y_low = [0] * len(labels)
+        fig.add_trace(go.Bar(
+            x=labels,
+            y=y_low,
+            name=f'{cat} - Low',
+            marker=dict(color=color_l),
+            offsetgroup=f'{cat}_low',
+            legendgroup=cat,
+            hovertemplate=f'{cat} - Low<br>%{{x}}<br>count: %{{y}}<extra></extra>'
+        ))
+
+    fig.update_layout(
+        title='세션별 TMSSR 범주별 High / Low (막대그래프)',
+        xaxis_title='날짜 #회차',
+        yaxis_title='발화 수',
+        xaxis=dict(tickangle=-45),
+        margin=dict(l=40, r=20, t=70, b=120),
+        template='plotly_white',
+        barmode='group',
+        legend=dict(orientation='h', yanchor='bottom', y=1.02, xanchor='right', x=1)
+    )
+    fig.update_layout(font=dict(family='Noto Sans KR, sans-serif', size=12))
+    return fig
@@ -0,0 +1,186 @@
+"""분석 그래프 일괄 보고서 (Streamlit 없이 실행)
+
+    python -m lessonplay.report [--out reports] [--date 2025-12-01] [--workers 4] [--no-png] [--force]
+
+data/analysis-*/ 의 코딩 CSV마다 세 그래프를 HTML(kaleido가 설치돼 있으면 PNG도)로
+<out>/<날짜>/<분석 폴더>/<수업>_<학생>/ 에 씁니다. 그래프는 여러 프로세스에서 나눠 그립니다.
+CSV 내용 해시가 지난 실행과 같으면 다시 그리지 않고, 지난 실행의 파일을 새 날짜 폴더로 링크(안 되면 복사)합니다.
+"""
+import argparse
+import datetime
+import json
+import os
+import shutil
+import sys
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+
+from lessonplay.analysis_store import discover_coded_csvs
+from lessonplay.coding import aggregate_coded
+from lessonplay.figure_cache import file_digest
+from lessonplay.ingest import BASE_DIR
+from lessonplay.plots import plot_summary, plot_tmssr_potential_trends, plot_tmssr_proportions
+from lessonplay.utterances import read_coded_csv
+
+REPORT_DIR = "reports"
+MANIFEST_NAME = ".manifest.json"
+
+# 그래프 모양이 바뀌면 버전을 올려서 입력이 같아도 다시 그리게 합니다.
+REPORT_VERSION = 1
+
+# {파일 이름: 집계 → 그림 (그릴 것이 없으면 None)}
+REPORT_FIGURES = {
+    "high_low_trend": lambda agg: plot_summary(agg["summary"]) if not agg["summary"].empty else None,
+    "tmssr_proportions": lambda agg: plot_tmssr_proportions(agg["tmssr"]) if len(agg["tmssr"]) else None,
+    "tmssr_potential": lambda agg: (
+        plot_tmssr_potential_trends(agg["potential"], agg["labels"]) if len(agg["potential"]) else None
+    ),
+}
+
+
+def png_available() -> bool:
+    """정적 이미지(PNG)를 쓰려면 kaleido가 필요합니다."""
+    try:
+        import kaleido  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+# ---------------------------
+# ① 학생 한 명 그리기 (작업 프로세스에서 실행)
+# ---------------------------
+def _render_one(args):
+    """(학생 키, CSV 경로, 출력 폴더, PNG 여부) → (학생 키, 쓴 파일 이름 목록, 오류 메시지 또는 None)"""
+    key, csv_path, out_dir, png = args
+    try:
+        agg = aggregate_coded(read_coded_csv(csv_path))
+        os.makedirs(out_dir, exist_ok=True)
+        written = []
+        for name, build in REPORT_FIGURES.items():
+            fig = build(agg)
+            if fig is None:
+                continue
+            fig.write_html(os.path.join(out_dir, f"{name}.html"), include_plotlyjs="cdn")
+            written.append(f"{name}.html")
+            if png:
+                fig.write_image(os.path.join(out_dir, f"{name}.png"), width=1200, height=600, scale=2)
+                written.append(f"{name}.png")
+        return key, written, None
+    except Exception as e:
+        return key, [], str(e)
+
+
+def _reuse(files, src_dir: str, dst_dir: str):
+    """지난 실행의 출력을 새 폴더로 하드 링크 (파일 시스템이 다르면 복사)"""
+    os.makedirs(dst_dir, exist_ok=True)
+    for name in files:
+        src, dst = os.path.join(src_dir, name), os.path.join(dst_dir, name)
+        if os.path.exists(dst):
+            os.remove(dst)
+        try:
+            os.link(src, dst)
+        except OSError:
+            shutil.copy2(src, dst)
+
+
+# ---------------------------
+# ② manifest (학생 키 → 입력 해시·출력 위치)
+# ---------------------------
+def load_manifest(path: str) -> dict:
+    try:
+        with open(path, encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return manifest if manifest.get("version") == REPORT_VERSION else {}
+
+
+def save_manifest(manifest: dict, path: str):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=1)
+    os.replace(tmp_path, path)
+
+
+# ---------------------------
+# ③ 보고서 생성
+# ---------------------------
+def build_report(out_root: str = REPORT_DIR, date: str = None, base_dir: str = BASE_DIR,
+                 png=None, force: bool = False, max_workers=None):
+    """모든 학생의 그래프를 <out_root>/<date>/ 아래에 씁니다.
+
+    png: None이면 kaleido가 있을 때만 PNG를 씀
+    반환값: {"rendered", "reused", "skipped", "errors": [(학생 키, 오류)], "out_dir"}
+    """
+    date = date or datetime.date.today().isoformat()
+    png = png_available() if png is None else png
+    manifest_path = os.path.join(out_root, MANIFEST_NAME)
+    manifest = {} if force else load_manifest(manifest_path)
+    entries = manifest.get("entries", {})
+
+    jobs, reused, skipped = [], 0, 0
+    for key, entry in discover_coded_csvs(base_dir).iterrows():
+        out_dir = os.path.join(out_root, date, *key.split("/"))
+        digest = file_digest(entry["파일 경로"])
+        prev = entries.get(key)
+        if (prev and prev["digest"] == digest and (prev["png"] or not png)
+                and all(os.path.exists(os.path.join(prev["dir"], f)) for f in prev["files"])):
+            if os.path.abspath(prev["dir"]) == os.path.abspath(out_dir):
+                skipped += 1
+            else:
+                _reuse(prev["files"], prev["dir"], out_dir)
+                entries[key] = {**prev, "dir": out_dir}
+                reused += 1
+            continue
+        jobs.append((key, entry["파일 경로"], out_dir, png))
+        entries[key] = {"digest": digest, "png": png, "dir": out_dir, "files": []}
+
+    workers = max_workers or os.cpu_count() or 1
+    if workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+            outcomes = list(pool.map(_render_one, jobs))
+    else:
+        outcomes = [_render_one(job) for job in jobs]
+
+    errors = []
+    for key, written, error in outcomes:
+        if error is None:
+            entries[key]["files"] = written
+        else:
+            # 실패한 학생은 다음 실행에서 다시 그리도록 기록을 지움
+            entries.pop(key, None)
+            errors.append((key, error))
+
+    save_manifest({"version": REPORT_VERSION, "entries": entries}, manifest_path)
+    return {
+        "rendered": len(jobs) - len(errors), "reused": reused, "skipped": skipped,
+        "errors": errors, "out_dir": os.path.join(out_root, date),
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="분석 그래프 일괄 보고서 (HTML/PNG)")
+    parser.add_argument("--out", default=REPORT_DIR, help=f"출력 최상위 폴더 (기본: {REPORT_DIR})")
+    parser.add_argument("--date", help="날짜 폴더 이름 (기본: 오늘, YYYY-MM-DD)")
+    parser.add_argument("--data", default=BASE_DIR, help=f"data 폴더 (기본: {BASE_DIR})")
+    parser.add_argument("--workers", type=int, help="그래프를 그릴 프로세스 수 (기본: CPU 코어 수)")
+    parser.add_argument("--no-png", action="store_true", help="PNG를 쓰지 않고 HTML만 씀")
+    parser.add_argument("--force", action="store_true", help="입력이 같아도 모두 다시 그림")
+    args = parser.parse_args(argv)
+
+    png = False if args.no_png else None
+    if png is None and not png_available():
+        print("ℹ️ kaleido가 없어 HTML만 씁니다 (PNG가 필요하면: pip install kaleido)", file=sys.stderr)
+
+    report = build_report(args.out, args.date, args.data, png=png, force=args.force, max_workers=args.workers)
+    print(f"✅ {report['out_dir']}: 새로 그림 {report['rendered']}명 · "
+          f"지난 결과 재사용 {report['reused']}명 · 변경 없음 {report['skipped']}명")
+    for key, error in report["errors"]:
+        print(f"❌ {key}: {error}", file=sys.stderr)
+    return 1 if report["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
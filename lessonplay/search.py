@@ -0,0 +1,442 @@
+"""converted_txt 전문 검색
+
+converted_txt/*.txt 의 '[화자] 메시지' 줄을 발화 하나씩 문서로 보고, 글자 2-gram 역색인을 만들어 둡니다.
+한국어는 띄어쓰기가 들쭉날쭉하므로 공백을 지운 뒤 n-gram을 만들고, 검색어도 같은 방식으로 바꿉니다
+('소인수 분해'와 '소인수분해'가 같은 결과).
+
+색인은 data/.cache/search_v<SEARCH_VERSION>/ 에 저장하고, TXT 파일의 (mtime, 크기)가 바뀐 파일만 다시 읽습니다.
+- seg-*/ : 세그먼트 — 갱신 한 번에 새로 읽은 TXT들만 담고, 다 쓴 세그먼트 폴더는 고치지 않음
+  - docs.parquet: 발화 (파일, turn, 화자, 메시지) — 파일·turn 순
+  - vocab.parquet, offsets.npy, postings.npy: CSR 역색인 (세그먼트 안 발화 번호), doc_lengths.npy: 발화별 정규화 길이
+    — 메모리 매핑으로 읽음
+- manifest.json: 버전, 세대 이름, 세그먼트 목록, 파일별 (mtime, 크기, 세그먼트, 발화 수), 세그먼트별로 지운 파일
+  — 이 파일을 바꾸는 순간 새 세대 전체가 한꺼번에 보임
+갱신은 바뀐 TXT만 새 세그먼트로 덧붙이고, 바뀌거나 사라진 파일은 옛 세그먼트에 '지움' 표시만 합니다.
+세그먼트가 MAX_SEGMENTS개를 넘거나 지운 발화가 절반을 넘으면 살아 있는 발화만 세그먼트 하나로 합칩니다
+(n-gram은 다시 만들지 않고 역색인에서 그대로 옮김).
+사용자·날짜·시나리오는 색인에 넣지 않고 검색할 때 세션 인덱스에서 붙입니다 (attach_session_meta).
+"""
+import json
+import math
+import os
+import re
+import shutil
+import threading
+import unicodedata
+import uuid
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from lessonplay.convert import OUTPUT_DIR, txt_name_for
+from lessonplay.ingest import BASE_DIR
+from lessonplay.shared_cache import get_shared
+from lessonplay.timing import stage
+
+SEARCH_VERSION = 4
+SEARCH_DIR = os.path.join(BASE_DIR, ".cache", f"search_v{SEARCH_VERSION}")
+NGRAM = 2
+# 세그먼트가 이보다 많아지면 하나로 합침
+MAX_SEGMENTS = 8
+
+# BM25 파라미터
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# 색인 폴더 → 갱신 잠금 — 두 갱신이 겹쳐 한쪽이 다른 쪽의 새 세그먼트를 '안 쓰는 세그먼트'로 지우지 않게 함
+_update_locks = {}
+_update_locks_guard = threading.Lock()
+
+_LINE_RE = re.compile(r"^\[([^\]]*)\] ?(.*)$")
+_SPACE_RE = re.compile(r"\s+")
+
+
+# ---------------------------
+# ① 텍스트 → n-gram
+# ---------------------------
+def normalize_text(text: str) -> str:
+    """검색용 정규화: 유니코드 NFC + 소문자 + 공백 제거"""
+    return _SPACE_RE.sub("", unicodedata.normalize("NFC", str(text)).lower())
+
+
+def text_grams(text: str) -> set:
+    """정규화한 글자열의 NGRAM-gram 집합 (NGRAM보다 짧으면 빈 집합)"""
+    s = normalize_text(text)
+    return {s[i:i + NGRAM] for i in range(len(s) - NGRAM + 1)}
+
+
+def parse_txt(path: str):
+    """변환된 TXT → [(화자, 메시지)] — 첫 줄 '[화자] 메시지' 헤더는 건너뛰고, '['로 시작하지 않는 줄은 앞 발화에 이어 붙입니다."""
+    utterances = []
+    with open(path, encoding="utf-8") as f:
+        for i, line in enumerate(f):
+            line = line.rstrip("\n")
+            m = _LINE_RE.match(line)
+            if i == 0 and m and m.groups() == ("화자", "메시지"):
+                continue
+            if m:
+                utterances.append([m.group(1), m.group(2)])
+            elif utterances:
+                utterances[-1][1] += "\n" + line
+    return [tuple(u) for u in utterances]
+
+
+def _file_rows(txt_name: str, path: str):
+    """TXT 파일 하나 → (발화 프레임, (gram, 파일, 순번) 프레임)"""
+    utterances = parse_txt(path)
+    docs = pd.DataFrame({
+        "파일": txt_name,
+        "turn": np.arange(1, len(utterances) + 1, dtype=np.int32),
+        "화자": [u[0] for u in utterances],
+        "메시지": [u[1] for u in utterances],
+    })
+    grams, seq = [], []
+    for i, (_, message) in enumerate(utterances):
+        g = text_grams(message)
+        grams.extend(g)
+        seq.extend([i] * len(g))
+    pairs = pd.DataFrame({"gram": grams, "파일": txt_name, "seq": np.asarray(seq, dtype=np.int32)})
+    return docs, pairs
+
+
+# ---------------------------
+# ② 색인 만들기/갱신
+# ---------------------------
+def _read_manifest(index_dir: str) -> dict:
+    try:
+        with open(os.path.join(index_dir, "manifest.json"), encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return manifest if manifest.get("version") == SEARCH_VERSION else {}
+
+
+def _update_lock(index_dir: str) -> threading.Lock:
+    with _update_locks_guard:
+        return _update_locks.setdefault(os.path.abspath(index_dir), threading.Lock())
+
+
+def _write_atomic(write, path: str):
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    write(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def _pair_doc_ids(docs: pd.DataFrame, pairs: pd.DataFrame) -> np.ndarray:
+    """(gram, 파일, 순번) → 발화 번호 = 파일의 첫 발화 번호 + 순번"""
+    files = docs["파일"].to_numpy()
+    starts = pd.Series(np.flatnonzero(np.r_[True, files[1:] != files[:-1]]) if len(files) else [],
+                       index=pd.unique(files) if len(files) else [], dtype=np.int64)
+    return starts.reindex(pairs["파일"].astype(object)).to_numpy() + pairs["seq"].to_numpy()
+
+
+def _write_segment(docs: pd.DataFrame, grams: np.ndarray, doc_ids: np.ndarray, seg_dir: str):
+    """발화 + (gram, 발화 번호) → 세그먼트 폴더 (docs.parquet, CSR 역색인, 발화별 정규화 길이 — BM25용)"""
+    os.makedirs(seg_dir, exist_ok=True)
+    docs = docs.astype({"파일": "category", "화자": "category"})
+    pq.write_table(pa.Table.from_pandas(docs, preserve_index=False), os.path.join(seg_dir, "docs.parquet"))
+
+    gram_codes, vocab = pd.factorize(pd.Series(grams, dtype=object), sort=True)
+    order = np.lexsort((doc_ids, gram_codes))
+    postings = np.asarray(doc_ids)[order].astype(np.int32)
+    offsets = np.r_[0, np.cumsum(np.bincount(gram_codes, minlength=len(vocab)))].astype(np.int64)
+
+    pq.write_table(pa.table({"gram": pa.array(vocab.astype(str), pa.string())}), os.path.join(seg_dir, "vocab.parquet"))
+    np.save(os.path.join(seg_dir, "offsets.npy"), offsets)
+    np.save(os.path.join(seg_dir, "postings.npy"), postings)
+    doc_lengths = docs["메시지"].astype(object).fillna("").map(normalize_text).str.len().to_numpy(dtype=np.int32)
+    np.save(os.path.join(seg_dir, "doc_lengths.npy"), doc_lengths)
+
+
+def _read_segment(seg_dir: str) -> dict:
+    """세그먼트 폴더 → {"docs", "grams" (gram 배열), "offsets", "postings", "doc_lengths"} (배열은 메모리 매핑)"""
+    return {
+        "docs": pq.read_table(os.path.join(seg_dir, "docs.parquet"), memory_map=True).to_pandas(),
+        "grams": np.asarray(pq.read_table(os.path.join(seg_dir, "vocab.parquet")).column("gram").to_pylist(),
+                            dtype=object),
+        "offsets": np.load(os.path.join(seg_dir, "offsets.npy"), mmap_mode="r"),
+        "postings": np.load(os.path.join(seg_dir, "postings.npy"), mmap_mode="r"),
+        "doc_lengths": np.load(os.path.join(seg_dir, "doc_lengths.npy"), mmap_mode="r"),
+    }
+
+
+def _live_ids(docs: pd.DataFrame, dead_files, base: int) -> np.ndarray:
+    """세그먼트 안 발화 번호 → 전체 번호 (base부터 차례로, 지운 파일의 발화는 -1)"""
+    alive = ~docs["파일"].astype(object).isin(list(dead_files)).to_numpy(dtype=bool)
+    remap = np.full(len(docs), -1, dtype=np.int64)
+    remap[alive] = np.arange(base, base + int(alive.sum()))
+    return remap
+
+
+def _merge_segments(index_dir: str, segments: list, dead: dict) -> str:
+    """세그먼트들의 살아 있는 발화만 새 세그먼트 하나로 — 역색인의 (gram, 발화 번호)를 번호만 바꿔 옮김"""
+    docs_parts, gram_parts, id_parts = [], [], []
+    base = 0
+    for name in segments:
+        seg = _read_segment(os.path.join(index_dir, name))
+        remap = _live_ids(seg["docs"], dead.get(name, {}), base)
+        ids = remap[np.asarray(seg["postings"])]
+        grams = np.repeat(seg["grams"], np.diff(seg["offsets"]))
+        keep = ids >= 0
+        gram_parts.append(grams[keep])
+        id_parts.append(ids[keep])
+        docs_parts.append(seg["docs"][remap >= 0].astype({"파일": object, "화자": object}))
+        base += int((remap >= 0).sum())
+    merged = f"seg-{uuid.uuid4().hex[:12]}"
+    docs = pd.concat(docs_parts, ignore_index=True) if docs_parts else _file_rows_empty()[0]
+    _write_segment(docs, np.concatenate(gram_parts) if gram_parts else np.empty(0, dtype=object),
+                   np.concatenate(id_parts) if id_parts else np.empty(0, dtype=np.int64),
+                   os.path.join(index_dir, merged))
+    return merged
+
+
+def update_search_index(txt_dir: str = OUTPUT_DIR, index_dir: str = SEARCH_DIR, rebuild: bool = False) -> dict:
+    """색인을 converted_txt 폴더와 맞춥니다. 반환값: {"indexed", "reused", "removed", "utterances", "segments"}"""
+    # 다른 갱신이 끝난 뒤에 스캔해야 그 갱신이 만든 세대 위에 지금 폴더 상태를 합침
+    with _update_lock(index_dir):
+        with stage("TXT 스캔") as s:
+            found = {}
+            if os.path.isdir(txt_dir):
+                for entry in os.scandir(txt_dir):
+                    if entry.is_file() and entry.name.endswith(".txt"):
+                        st_ = entry.stat()
+                        found[entry.name] = [st_.st_mtime_ns, st_.st_size]
+            s["rows"] = len(found)
+        return _update_segments(found, txt_dir, index_dir, rebuild)
+
+
+def _update_segments(found: dict, txt_dir: str, index_dir: str, rebuild: bool) -> dict:
+    """바뀐 TXT → 새 세그먼트 하나 + 옛 세그먼트에 지움 표시, 그다음 manifest.json 교체로 한꺼번에 전환"""
+    manifest = {} if rebuild else _read_manifest(index_dir)
+    if any(not os.path.isdir(os.path.join(index_dir, seg)) for seg in manifest.get("segments", [])):
+        manifest = {}
+    files = dict(manifest.get("files", {}))
+    segments = list(manifest.get("segments", []))
+    dead = {seg: dict(names) for seg, names in manifest.get("dead", {}).items()}
+    changed = sorted(name for name, fp in found.items() if files.get(name, [None, None])[:2] != fp)
+    removed = [name for name in files if name not in found]
+    if not changed and not removed and manifest:
+        return {"indexed": 0, "reused": len(found), "removed": 0, "utterances": manifest["utterances"],
+                "segments": len(segments)}
+
+    # 바뀌거나 사라진 파일의 옛 발화는 지우지 않고 표시만 (세그먼트를 다시 쓰지 않음)
+    for name in changed + removed:
+        if name in files:
+            _, _, seg, n = files.pop(name)
+            dead.setdefault(seg, {})[name] = n
+
+    with stage("TXT 읽기·n-gram", rows=len(changed)):
+        new_docs, new_pairs = [], []
+        for name in changed:
+            docs, pairs = _file_rows(name, os.path.join(txt_dir, name))
+            new_docs.append(docs)
+            new_pairs.append(pairs)
+
+    with stage("세그먼트 쓰기 (CSR)") as s:
+        os.makedirs(index_dir, exist_ok=True)
+        if changed:
+            docs = pd.concat(new_docs, ignore_index=True)
+            pairs = pd.concat(new_pairs, ignore_index=True)
+            seg = f"seg-{uuid.uuid4().hex[:12]}"
+            _write_segment(docs, pairs["gram"].to_numpy(dtype=object), _pair_doc_ids(docs, pairs),
+                           os.path.join(index_dir, seg))
+            segments.append(seg)
+            for name, d in zip(changed, new_docs):
+                files[name] = found[name] + [seg, len(d)]
+            s["rows"] = len(docs)
+
+        # 살아 있는 파일이 없는 세그먼트는 빼고, 너무 많거나 지운 발화가 많으면 하나로 합침
+        used = {f[2] for f in files.values()}
+        segments = [seg for seg in segments if seg in used]
+        dead = {seg: names for seg, names in dead.items() if seg in used}
+        n_live = sum(f[3] for f in files.values())
+        n_dead = sum(sum(names.values()) for names in dead.values())
+    if len(segments) > MAX_SEGMENTS or n_dead > n_live:
+        with stage("세그먼트 합치기", rows=n_live):
+            merged = _merge_segments(index_dir, segments, dead)
+            segments, dead = [merged], {}
+            files = {name: f[:2] + [merged, f[3]] for name, f in files.items()}
+
+    new_manifest = {
+        "version": SEARCH_VERSION, "generation": f"gen-{uuid.uuid4().hex[:12]}",
+        "segments": segments, "dead": dead, "files": files, "utterances": n_live,
+    }
+
+    def write_manifest(p):
+        with open(p, "w", encoding="utf-8") as f:
+            json.dump(new_manifest, f, ensure_ascii=False)
+    _write_atomic(write_manifest, os.path.join(index_dir, "manifest.json"))
+
+    # 안 쓰는 세그먼트 정리 (이미 메모리 매핑해 둔 프로세스는 지워진 뒤에도 계속 읽을 수 있음)
+    for entry in os.scandir(index_dir):
+        if entry.is_dir() and entry.name.startswith("seg-") and entry.name not in segments:
+            shutil.rmtree(entry.path, ignore_errors=True)
+
+    return {"indexed": len(changed), "reused": len(found) - len(changed), "removed": len(removed),
+            "utterances": n_live, "segments": len(segments)}
+
+
+def _file_rows_empty():
+    docs = pd.DataFrame({"파일": pd.Series(dtype=object), "turn": pd.Series(dtype=np.int32),
+                         "화자": pd.Series(dtype=object), "메시지": pd.Series(dtype=object)})
+    pairs = pd.DataFrame({"gram": pd.Series(dtype=object), "파일": pd.Series(dtype=object),
+                          "seq": pd.Series(dtype=np.int32)})
+    return docs, pairs
+
+
+# ---------------------------
+# ③ 색인 읽기 + 검색
+# ---------------------------
+def search_version(index_dir: str = SEARCH_DIR):
+    """현재 색인 세대 이름 (색인이 없으면 None) — 화면 쪽 캐시 키로 씁니다."""
+    return _read_manifest(index_dir).get("generation")
+
+
+def load_search_index(index_dir: str = SEARCH_DIR):
+    """색인을 읽습니다 (세대가 같으면 프로세스 안에서 읽어 둔 것을 그대로 씀). 색인이 없으면 None.
+
+    반환 dict: {"generation", "docs" (살아 있는 발화), "norm" (정규화한 메시지, Arrow 문자열 배열),
+    "segments" ([{"vocab" ({gram: 번호}), "offsets", "postings", "ids" (세그먼트 번호 → 전체 번호, 지운 발화 -1)}]),
+    "doc_lengths" (발화별 정규화 길이), "avg_len" (평균 길이 — 세대마다 한 번 계산)}
+    """
+    for _ in range(2):
+        manifest = _read_manifest(index_dir)
+        if not manifest:
+            return None
+        try:
+            return get_shared(("search_index", index_dir), manifest["generation"],
+                              lambda: _read_search_index(index_dir, manifest))
+        except FileNotFoundError:
+            # manifest를 읽은 사이에 다른 갱신이 세그먼트를 합치고 옛 세그먼트를 지웠음 → 새 manifest로 다시 읽음
+            continue
+    return None
+
+
+def _read_search_index(index_dir: str, manifest: dict) -> dict:
+    docs_parts, lengths, segments = [], [], []
+    base = 0
+    for name in manifest["segments"]:
+        seg = _read_segment(os.path.join(index_dir, name))
+        ids = _live_ids(seg["docs"], manifest["dead"].get(name, {}), base)
+        alive = ids >= 0
+        docs_parts.append(seg["docs"][alive].astype({"파일": object, "화자": object}))
+        lengths.append(np.asarray(seg["doc_lengths"])[alive])
+        segments.append({
+            "vocab": {g: i for i, g in enumerate(seg["grams"])},
+            "offsets": seg["offsets"], "postings": seg["postings"], "ids": ids,
+        })
+        base += int(alive.sum())
+    docs = pd.concat(docs_parts, ignore_index=True) if docs_parts else _file_rows_empty()[0]
+    docs = docs.astype({"파일": "category", "화자": "category"})
+    doc_lengths = np.concatenate(lengths) if lengths else np.empty(0, dtype=np.int32)
+    return {
+        "generation": manifest["generation"],
+        "docs": docs,
+        "norm": pa.array(docs["메시지"].astype(object).fillna("").map(normalize_text).tolist(), pa.string()),
+        "segments": segments,
+        "doc_lengths": doc_lengths,
+        "avg_len": max(float(doc_lengths.mean()) if len(doc_lengths) else 1.0, 1.0),
+    }
+
+
+def attach_session_meta(docs: pd.DataFrame, index_df: pd.DataFrame) -> pd.DataFrame:
+    """발화마다 세션 정보(수업, 날짜, 사용자, 시나리오)를 붙인 프레임 — TXT 이름으로 세션 인덱스와 맞춤"""
+    meta = index_df[["파일 경로", "수업", "날짜", "사용자", "시나리오"]].copy()
+    meta["파일"] = meta["파일 경로"].map(txt_name_for)
+    meta = meta.drop_duplicates("파일").set_index("파일").drop(columns="파일 경로")
+    return docs.join(meta, on="파일")
+
+
+def query_terms(query: str) -> list:
+    """검색어 → 정규화한 단어 목록 (공백으로 나눔, 빈 단어는 뺌)"""
+    terms = [normalize_text(t) for t in query.split()]
+    return [t for t in terms if t]
+
+
+def _gram_postings(index, gram: str) -> np.ndarray:
+    """n-gram 하나가 들어 있는 발화 번호 (세그먼트마다 찾아 전체 번호로 바꾸고 지운 발화는 뺌, 정렬됨)"""
+    parts = []
+    for seg in index["segments"]:
+        i = seg["vocab"].get(gram)
+        if i is not None:
+            ids = seg["ids"][seg["postings"][seg["offsets"][i]:seg["offsets"][i + 1]]]
+            parts.append(ids[ids >= 0])
+    return np.concatenate(parts) if parts else np.empty(0, dtype=np.int64)
+
+
+def _term_candidates(index, term: str) -> np.ndarray:
+    """NGRAM 글자 이상인 검색어 한 개의 후보 발화 번호 (n-gram 교집합)"""
+    lists = []
+    for g in text_grams(term):
+        ids = _gram_postings(index, g)
+        if not len(ids):
+            return ids
+        lists.append(ids)
+    lists.sort(key=len)
+    ids = lists[0]
+    for other in lists[1:]:
+        if not len(ids):
+            break
+        ids = np.intersect1d(ids, other, assume_unique=True)
+    return ids
+
+
+def search(index, query: str, docs: pd.DataFrame = None, filters: dict = None, limit: int = 50) -> pd.DataFrame:
+    """검색어(공백으로 나눈 단어 모두 포함)에 맞는 발화를 BM25 점수순으로 돌려줍니다.
+
+    NGRAM 글자보다 짧은 단어는 역색인으로 좁힐 수 없으므로 다른 긴 단어로 좁힌 후보에서만 확인합니다.
+    긴 단어가 하나도 없으면 (예: '수') 코퍼스 전체를 훑어야 하므로 빈 결과를 돌려줍니다.
+    docs: 필터에 쓸 세션 정보를 붙인 발화 프레임 (attach_session_meta 결과, 없으면 index["docs"])
+    filters: {컬럼: 허용 값 목록} — 예: {"화자": ["교사"], "사용자": ["정민지"]}
+    반환 프레임: docs의 컬럼 + 점수, 앞 발화, 뒤 발화 (index: 발화 번호)
+    """
+    docs = index["docs"] if docs is None else docs
+    terms = query_terms(query)
+    if not any(len(t) >= NGRAM for t in terms):
+        return docs.iloc[:0].assign(점수=[], **{"앞 발화": [], "뒤 발화": []})
+
+    # 1) n-gram 교집합으로 후보 좁히기
+    candidates = None
+    for term in terms:
+        if len(term) >= NGRAM:
+            ids = _term_candidates(index, term)
+            candidates = ids if candidates is None else np.intersect1d(candidates, ids, assume_unique=True)
+
+    # 2) 필터 (화자·사용자·날짜·시나리오 등)
+    for col, allowed in (filters or {}).items():
+        if allowed:
+            keep = docs[col].iloc[candidates].isin(allowed).to_numpy(dtype=bool)
+            candidates = candidates[keep]
+
+    # 3) n-gram은 순서를 보지 않으므로 실제로 포함하는지 확인 (Arrow 문자열 커널로 한 번에) + BM25 점수
+    norm = index["norm"].take(pa.array(candidates, pa.int64()))
+    n_docs = max(len(index["norm"]), 1)
+    lengths = index["doc_lengths"][candidates].astype(np.float64)
+    avg_len = index["avg_len"]
+    scores = np.zeros(len(candidates))
+    matched = np.ones(len(candidates), dtype=bool)
+    for term in terms:
+        tf = pc.count_substring(norm, term).to_numpy(zero_copy_only=False).astype(np.float64)
+        matched &= tf > 0
+        df = max(int((tf > 0).sum()), 1)
+        idf = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+        scores += idf * tf * (BM25_K1 + 1) / (tf + BM25_K1 * (1 - BM25_B + BM25_B * lengths / avg_len))
+    candidates, scores = candidates[matched], scores[matched]
+
+    # 4) 점수순 상위 limit개 (같은 점수는 파일·turn 순 — 세그먼트 배치와 관계없이 같은 순서) + 같은 세션의 앞뒤 발화
+    file_codes = index["docs"]["파일"].cat.codes.to_numpy()[candidates]
+    turns = index["docs"]["turn"].to_numpy()[candidates]
+    top = np.lexsort((turns, file_codes, -scores))[:limit]
+    ids, scores = candidates[top], scores[top]
+    files = index["docs"]["파일"].to_numpy()
+    messages = index["docs"]["메시지"].to_numpy()
+    prev_ok = (ids > 0) & (files[np.maximum(ids - 1, 0)] == files[ids])
+    next_ok = (ids + 1 < len(files)) & (files[np.minimum(ids + 1, len(files) - 1)] == files[ids])
+    result = docs.iloc[ids].copy()
+    result["점수"] = np.round(scores, 3)
+    result["앞 발화"] = np.where(prev_ok, messages[np.maximum(ids - 1, 0)], None)
+    result["뒤 발화"] = np.where(next_ok, messages[np.minimum(ids + 1, len(files) - 1)], None)
+    return result
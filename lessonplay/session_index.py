@@ -0,0 +1,207 @@
+"""세션 요약 인덱스
+
+data/Rehearsal, data/TeachingMethod 아래 CSV마다 요약 한 행을 만들어 Parquet 파일에 저장해 둡니다.
+각 행은 (파일 경로, mtime, 크기)로 식별되며, 다음 실행부터는 새로 생기거나 바뀐 파일만 다시 파싱하고
+사라진 파일의 행은 지웁니다. 파싱은 발화 저장소(lessonplay.utterances)를 갱신하면서 한 번만 합니다.
+"""
+import os
+import threading
+import uuid
+
+import pandas as pd
+
+from lessonplay.dedup import session_signatures
+from lessonplay.ingest import BASE_DIR, ingest, rescan_paths, scan_files, summary_frame
+from lessonplay.metrics import session_metrics
+from lessonplay.shared_cache import NO_VERSION, get_shared, invalidate
+from lessonplay.timing import stage
+from lessonplay.utterances import STORE_DIR, update_store, utterance_frame
+from lessonplay.watch import start_watcher, take_changes, watch_generation
+
+CACHE_DIR = os.path.join(BASE_DIR, ".cache")
+
+# 요약 계산 방식이 바뀌면 버전을 올려서 기존 인덱스를 버리고 전체를 다시 계산합니다.
+INDEX_VERSION = 3
+INDEX_PATH = os.path.join(CACHE_DIR, f"session_index_v{INDEX_VERSION}.parquet")
+
+SUMMARY_COLUMNS = [
+    "수업", "날짜", "시간", "시나리오", "사용자",
+    "입력 수", "발문 수", "설명 수", "피드백 유무", "파일 경로", "session_id",
+]
+FINGERPRINT_COLUMNS = ["mtime_ns", "size"]
+# 거의 같은 세션 찾기용 MinHash 서명 (lessonplay.dedup) — 파싱할 때 한 번만 계산
+SIGNATURE_COLUMNS = ["minhash"]
+INDEX_COLUMNS = SUMMARY_COLUMNS + FINGERPRINT_COLUMNS + SIGNATURE_COLUMNS
+
+# 인덱스 경로 → 지난 갱신에서 읽지 못한 CSV 경로들 — 감시 모드(changed)에서는 폴더를 훑지 않으므로
+# 다음 갱신의 changed에 합쳐서 파일을 다시 건드리지 않아도 재시도되게 함 (갱신 잠금 안에서만 읽고 씀)
+_failed = {}
+
+# 인덱스 경로 → 갱신 잠금 — load_index부터 update_store, save_index까지 한 번에 한 갱신만 돌게 해서
+# 나중 갱신이 앞 갱신 전에 읽은 인덱스로 저장소·인덱스를 덮어써 앞 갱신의 새 CSV를 지우지 않게 함
+_update_locks = {}
+_update_locks_guard = threading.Lock()
+
+
+# ---------------------------
+# ① 인덱스 읽기/쓰기/갱신
+# ---------------------------
+def _update_lock(path: str) -> threading.Lock:
+    with _update_locks_guard:
+        return _update_locks.setdefault(os.path.abspath(path), threading.Lock())
+
+
+def load_index(path: str = INDEX_PATH) -> pd.DataFrame:
+    """저장된 인덱스를 읽습니다. 없거나 깨졌으면 빈 프레임을 반환합니다."""
+    if os.path.exists(path):
+        try:
+            return pd.read_parquet(path)
+        except Exception:
+            pass
+    return pd.DataFrame(columns=INDEX_COLUMNS)
+
+
+def save_index(df: pd.DataFrame, path: str = INDEX_PATH):
+    """임시 파일에 쓴 뒤 교체해서, 동시에 실행 중인 세션이 반쯤 쓴 파일을 읽지 않게 합니다."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    df.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, path)
+
+
+def index_version(index_df: pd.DataFrame) -> str:
+    """인덱스 내용(파일 경로·mtime·크기)이 같으면 같은 값 — 화면 쪽 캐시 키로 씁니다."""
+    if index_df.empty:
+        return f"v{INDEX_VERSION}-empty"
+    h = pd.util.hash_pandas_object(index_df[["파일 경로"] + FINGERPRINT_COLUMNS], index=False)
+    return f"v{INDEX_VERSION}-{len(index_df)}-{int(h.sum()) & 0xFFFFFFFFFFFFFFFF:016x}"
+
+
+def update_index(rebuild: bool = False, base_dir: str = BASE_DIR, path: str = INDEX_PATH,
+                 store_dir: str = STORE_DIR, changed=None):
+    """인덱스를 디스크 상태와 맞춥니다.
+
+    changed: 바뀐 것으로 알려진 CSV 경로들 (파일 감시기가 모은 것) — 주어지면 폴더 전체를 훑지 않고
+    저장된 인덱스의 (mtime, 크기)에 이 파일들과 지난 갱신에서 실패한 파일들만 다시 stat한 결과를 씁니다.
+    저장된 인덱스는 갱신 잠금을 얻은 뒤에 읽으므로, 기다리는 동안 다른 갱신이 넣은 파일도 그대로 남습니다.
+    None이면 전체 스캔.
+
+    반환값: (index_df, errors, stats)
+    - index_df: SUMMARY_COLUMNS + mtime_ns/size 컬럼, 파일 경로 순 정렬
+    - errors: [(파일명, 오류 메시지)] — 실패한 파일은 인덱스에 넣지 않아 다음 실행에서 다시 시도합니다.
+    - stats: {"reused", "parsed", "removed"} 개수
+    """
+    # 같은 인덱스를 갱신하는 다른 실행(감시기의 다른 번호, 업로드, 다시 만들기)이 끝날 때까지 기다림
+    with _update_lock(path):
+        # 잠금을 얻은 뒤에 읽어야 앞 갱신이 저장한 최신 인덱스 위에 이번 changed를 합침
+        old = pd.DataFrame(columns=INDEX_COLUMNS) if rebuild else load_index(path)
+        if changed is not None:
+            changed = set(changed) | _failed.get(os.path.abspath(path), set())
+        if changed is not None and not old.empty:
+            with stage("바뀐 파일만 stat (파일 감시)") as s:
+                known = {
+                    p: (os.path.relpath(p, base_dir).split(os.sep)[0], m, n)
+                    for p, m, n in zip(old["파일 경로"], old["mtime_ns"], old["size"])
+                }
+                found = rescan_paths(known, changed, base_dir)
+                s["rows"] = len(changed)
+        else:
+            with stage("파일 스캔 (os.walk·stat)") as s:
+                found = scan_files(base_dir)
+                s["rows"] = len(found)
+
+        # 경로·mtime·크기가 모두 같은 행만 재사용
+        if not old.empty:
+            current = pd.DataFrame(
+                [(p, m, s) for p, (_, m, s) in found.items()],
+                columns=["파일 경로"] + FINGERPRINT_COLUMNS,
+            )
+            reused = old.merge(current, on=["파일 경로"] + FINGERPRINT_COLUMNS, how="inner")
+        else:
+            reused = old
+        reused_paths = set(reused["파일 경로"])
+
+        # 발화 저장소를 먼저 맞추고, 거기서 새로 파싱한 결과를 그대로 요약에 씁니다.
+        with stage("발화 저장소 갱신") as s:
+            store_results, store_rows, store_errors, _ = update_store(
+                found, rebuild=rebuild, base_dir=base_dir, store_dir=store_dir
+            )
+            s["rows"] = len(store_rows)
+        parsed_by_store = {r["파일 경로"]: r for r in store_results}
+        failed = {e["파일 경로"] for e in store_errors}
+
+        # 저장소는 최신인데 인덱스에만 없는 파일은 따로 (여러 프로세스로) 파싱
+        pending = [(folder, p) for p, (folder, _, _) in found.items() if p not in reused_paths]
+        rest = [(folder, p) for folder, p in pending if p not in parsed_by_store and p not in failed]
+        with stage("CSV 읽기 (인덱스에만 없는 파일)", rows=len(rest)):
+            rest_results, rest_errors = ingest(rest, with_messages=True)
+        results = [parsed_by_store[p] for _, p in pending if p in parsed_by_store] + rest_results
+        errors = [(e["파일명"], e["오류"]) for e in store_errors + rest_errors]
+        _failed[os.path.abspath(path)] = {e["파일 경로"] for e in store_errors + rest_errors}
+
+        # 시나리오·입력 수·발문 수·설명 수는 새로 읽은 세션 전체를 한 프레임으로 모아 한 번에 계산
+        pending_paths = {p for _, p in pending}
+        frames = [
+            store_rows[store_rows["파일 경로"].isin(pending_paths).to_numpy(dtype=bool)],
+            utterance_frame(rest_results),
+        ]
+        frames = [f.astype({"파일 경로": object}) for f in frames if not f.empty]
+        records = summary_frame(results)
+        if not records.empty:
+            with stage("지표 계산 (bincount)") as s:
+                utterances = pd.concat(frames, ignore_index=True) if frames else store_rows
+                metrics = session_metrics(utterances)
+                s["rows"] = len(utterances)
+            with stage("MinHash 서명 (중복 찾기용)", rows=len(utterances)):
+                signatures = session_signatures(utterances)
+            records = records.join(metrics, on="파일 경로")
+            records["minhash"] = records["파일 경로"].map(signatures)
+            records["시나리오"] = records["시나리오"].fillna("")
+            for col in ["입력 수", "발문 수", "설명 수"]:
+                records[col] = records[col].fillna(0).astype(int)
+            fingerprints = records["파일 경로"].map(lambda p: found[p][1:])
+            records["mtime_ns"] = [f[0] for f in fingerprints]
+            records["size"] = [f[1] for f in fingerprints]
+
+        removed = len(set(old["파일 경로"]) - set(found))
+
+        if rebuild or len(records) or len(reused) != len(old) or not os.path.exists(path):
+            parsed = records.reindex(columns=INDEX_COLUMNS)
+            frames = [f for f in (reused, parsed) if not f.empty]
+            index_df = pd.concat(frames, ignore_index=True) if frames else parsed
+            index_df = index_df.sort_values("파일 경로", kind="stable").reset_index(drop=True)
+            with stage("인덱스 저장", rows=len(index_df)):
+                save_index(index_df, path)
+        else:
+            index_df = reused.sort_values("파일 경로", kind="stable").reset_index(drop=True)
+
+        stats = {"reused": len(reused), "parsed": len(records), "removed": removed}
+        return index_df, errors, stats
+
+
+def shared_index(rebuild: bool = False, watch: bool = True, base_dir: str = BASE_DIR, path: str = INDEX_PATH,
+                 store_dir: str = STORE_DIR, changed=None):
+    """여러 브라우저 세션이 같이 쓰는 update_index() — 반환값은 update_index()와 같음
+
+    - 파일 감시기가 돌면(watch=True) 감시기 번호가 버전: 번호가 그대로면 다시 스캔하지 않고 프로세스에
+      보관한 결과를 돌려주고, 바뀌었으면 한 세션만 감시기가 모은 파일을 다시 읽음 (나머지는 그 결과를 기다림)
+    - 감시기가 없으면 매번 스캔하되, 동시에 들어온 요청끼리는 한 번만 스캔
+    - rebuild=True면 저장된 인덱스를 버리고 다시 만든 뒤 보관한 결과도 버림
+    - changed: 이 화면이 직접 바꾼 CSV 경로들 (ZIP 가져오기 등) — 그 파일만 다시 읽고 보관한 결과를 버려서
+      감시기가 꺼져 있거나 이벤트가 늦어도 다른 세션이 옛 인덱스를 계속 쓰지 않게 함
+    버전이 다른 갱신(감시기의 다음 번호, changed, rebuild)이 겹쳐도 update_index()가 인덱스 경로마다 잠그므로
+    차례로 돌고, 나중 갱신은 앞 갱신이 저장한 인덱스 위에서 계산합니다.
+    """
+    key = ("session_index", path)
+    if rebuild or changed is not None:
+        result = update_index(rebuild=rebuild, base_dir=base_dir, path=path, store_dir=store_dir,
+                              changed=None if rebuild else changed)
+        invalidate(key)
+        return result
+    watched = watch and start_watcher(base_dir)
+
+    def load():
+        return update_index(base_dir=base_dir, path=path, store_dir=store_dir,
+                            changed=take_changes() if watched else None)
+
+    return get_shared(key, ("watch", watch_generation()) if watched else NO_VERSION, load)
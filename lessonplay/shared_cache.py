@@ -0,0 +1,115 @@
+"""프로세스 공유 데이터 캐시 (single-flight + 버전 + LRU)
+
+여러 브라우저 세션이 동시에 같은 데이터를 처음 요청하면, 한 세션만 읽고 나머지는 그 결과를 기다립니다.
+값마다 버전(파일의 (mtime, 크기), 감시기 번호 등)을 같이 두고, 버전이 달라지면 다음 요청이 다시 읽습니다.
+전체 크기가 SHARED_CACHE_BYTES를 넘으면 가장 오래 안 쓴 값부터 버립니다 (LRU).
+
+    df = get_shared(("summary", path), version, lambda: read(path))
+
+받은 값은 모든 세션이 같이 쓰므로 고치지 말고 copy/assign으로 새로 만들어 쓰세요.
+"""
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+SHARED_CACHE_BYTES = 512 * 1024 * 1024
+
+# 항상 다시 읽어야 하는 값(버전을 미리 알 수 없음)에 쓰는 버전 — 동시에 들어온 요청끼리만 결과를 나눔
+NO_VERSION = object()
+
+_entries = OrderedDict()  # key → (version, value, 크기)
+_inflight = {}  # key → {"version", "done": Event, "value", "error"}
+_lock = threading.Lock()
+_stats = {"hits": 0, "loads": 0, "joined": 0, "evictions": 0, "bytes": 0}
+
+
+def estimate_size(value) -> int:
+    """값이 차지하는 메모리 (대략) — 프레임은 deep memory_usage, 배열은 nbytes, dict/list/tuple은 합"""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, (pd.Series, pd.Index)):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    if isinstance(value, dict):
+        return sum(estimate_size(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return sum(estimate_size(v) for v in value)
+    return sys.getsizeof(value)
+
+
+def _evict():
+    """_lock을 잡은 채로 불러야 합니다."""
+    while _stats["bytes"] > SHARED_CACHE_BYTES and len(_entries) > 1:
+        _, (_, _, size) = _entries.popitem(last=False)
+        _stats["bytes"] -= size
+        _stats["evictions"] += 1
+
+
+def get_shared(key, version, load):
+    """key의 값이 version과 같으면 그대로, 아니면 load()로 읽어서 돌려줍니다.
+
+    같은 (key, version)을 다른 스레드가 이미 읽는 중이면 새로 읽지 않고 그 결과를 기다립니다.
+    load()에서 난 예외는 캐시하지 않고, 기다리던 요청에도 같은 예외를 올립니다.
+    version=NO_VERSION이면 캐시하지 않고 동시에 들어온 요청끼리만 결과를 나눕니다.
+    """
+    with _lock:
+        entry = _entries.get(key)
+        if entry is not None and version is not NO_VERSION and entry[0] == version:
+            _entries.move_to_end(key)
+            _stats["hits"] += 1
+            return entry[1]
+        flight = _inflight.get(key)
+        if flight is not None and flight["version"] == version:
+            _stats["joined"] += 1
+            leader = False
+        else:
+            flight = {"version": version, "done": threading.Event(), "value": None, "error": None}
+            _inflight[key] = flight
+            _stats["loads"] += 1
+            leader = True
+
+    if not leader:
+        flight["done"].wait()
+        if flight["error"] is not None:
+            raise flight["error"]
+        return flight["value"]
+
+    try:
+        flight["value"] = load()
+    except BaseException as e:
+        flight["error"] = e
+        raise
+    finally:
+        with _lock:
+            if _inflight.get(key) is flight:
+                del _inflight[key]
+            if flight["error"] is None and version is not NO_VERSION:
+                old = _entries.pop(key, None)
+                if old is not None:
+                    _stats["bytes"] -= old[2]
+                size = estimate_size(flight["value"])
+                _entries[key] = (version, flight["value"], size)
+                _stats["bytes"] += size
+                _evict()
+        flight["done"].set()
+    return flight["value"]
+
+
+def invalidate(key=None):
+    """key(없으면 전부)의 값을 버립니다 — 다음 요청이 다시 읽음"""
+    with _lock:
+        keys = list(_entries) if key is None else [key]
+        for k in keys:
+            entry = _entries.pop(k, None)
+            if entry is not None:
+                _stats["bytes"] -= entry[2]
+
+
+def shared_cache_stats() -> dict:
+    """{"hits", "loads", "joined", "evictions", "bytes", "entries", "max_bytes"}"""
+    with _lock:
+        return {**_stats, "entries": len(_entries), "max_bytes": SHARED_CACHE_BYTES}
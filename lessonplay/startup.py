@@ -0,0 +1,142 @@
+"""첫 화면 시간 측정
+
+    python -m lessonplay.startup [--runs 3] [--out startup_results.json]
+
+서버를 막 띄운 상태와 같도록 매번 새 프로세스에서
+1) 모듈 import 시간 — streamlit을 먼저 불러온 뒤(서버에는 이미 올라와 있으므로) 요약 페이지가 쓰는 모듈을
+   페이지와 같은 순서로 처음 불러올 때 걸린 시간 (앞 모듈이 이미 불러온 의존 모듈은 다시 세지 않음)
+2) 요약 페이지(streamlit_app.py) 첫 실행 — AppTest로 한 번 실행하고 timings.jsonl에 남은 단계 기록에서
+   첫 화면(부트스트랩으로 필터를 그린 시각)과 실행 전체 시간
+을 재서 JSON으로 씁니다. 현재 폴더의 data/를 그대로 씁니다.
+부트스트랩 파일이 아직 없으면 첫 실행은 첫 화면 = 전체 실행이고, 그 실행이 부트스트랩을 만듭니다.
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+from lessonplay.bootstrap import BOOTSTRAP_PATH
+from lessonplay.timing import TIMING_LOG_PATH
+
+APP_PATH = "streamlit_app.py"
+
+# 첫 화면 전에 불러오는 모듈 → 첫 화면 뒤에 불러오는 모듈 (streamlit_app.py와 같은 순서)
+FIRST_PAINT_MODULES = ["lessonplay.bootstrap", "lessonplay.timing"]
+DEFERRED_MODULES = [
+    "pandas", "pyarrow.parquet",
+    "lessonplay.corpus", "lessonplay.export", "lessonplay.filters", "lessonplay.session_index",
+    "lessonplay.shared_cache", "lessonplay.summary", "lessonplay.watch",
+]
+# 그래프를 실제로 그릴 때만 불러오는 모듈 (분석 페이지, 그림 캐시에 없을 때)
+CHART_MODULES = ["plotly.io", "lessonplay.plots"]
+
+FIRST_PAINT_STAGE = "첫 화면 (부트스트랩)"
+
+_IMPORT_PROBE = """
+import importlib, json, sys, time
+start = time.perf_counter()
+import streamlit
+times = {"streamlit": time.perf_counter() - start}
+for name in sys.argv[1:]:
+    start = time.perf_counter()
+    importlib.import_module(name)
+    times[name] = time.perf_counter() - start
+print(json.dumps({k: round(v * 1000, 1) for k, v in times.items()}))
+"""
+
+_RENDER_PROBE = """
+import json, sys
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file(sys.argv[1], default_timeout=600)
+at.run()
+print(json.dumps({"exceptions": [str(e.value) for e in at.exception]}, ensure_ascii=False))
+"""
+
+
+def _probe(script: str, args) -> dict:
+    """새 파이썬 프로세스에서 script를 실행하고 마지막 줄의 JSON을 돌려줍니다."""
+    done = subprocess.run([sys.executable, "-c", script, *args], capture_output=True, text=True, check=True)
+    return json.loads(done.stdout.strip().splitlines()[-1])
+
+
+def measure_imports() -> dict:
+    """{모듈: 처음 불러온 시간(ms)} — "streamlit"과 첫 화면 / 나중 모듈 합계 포함"""
+    times = _probe(_IMPORT_PROBE, FIRST_PAINT_MODULES + DEFERRED_MODULES + CHART_MODULES)
+    times["(첫 화면 전 합계)"] = round(sum(times[m] for m in FIRST_PAINT_MODULES), 1)
+    times["(첫 화면 뒤 합계)"] = round(sum(times[m] for m in DEFERRED_MODULES), 1)
+    return times
+
+
+def _last_run(page: str, log_path: str = TIMING_LOG_PATH):
+    try:
+        with open(log_path, encoding="utf-8") as f:
+            lines = f.readlines()
+    except OSError:
+        return None
+    for line in reversed(lines):
+        record = json.loads(line)
+        if record["page"] == page:
+            return record
+    return None
+
+
+def measure_first_render(app_path: str = APP_PATH) -> dict:
+    """요약 페이지를 새 프로세스에서 한 번 실행 → {"bootstrap", "first_paint_ms", "total_ms", "wall_ms", "exceptions"}"""
+    had_bootstrap = os.path.exists(BOOTSTRAP_PATH)
+    start = time.perf_counter()
+    outcome = _probe(_RENDER_PROBE, [app_path])
+    wall_ms = round((time.perf_counter() - start) * 1000, 1)
+
+    record = _last_run("요약") or {"total_ms": None, "stages": []}
+    first_paint = next((s for s in record["stages"] if s["stage"] == FIRST_PAINT_STAGE), None)
+    return {
+        "bootstrap": had_bootstrap,
+        # 부트스트랩이 없으면 필터는 실행 끝 무렵에야 그려지므로 전체 실행 시간을 첫 화면으로 봄
+        "first_paint_ms": round(first_paint["at_ms"] + first_paint["ms"], 1) if first_paint else record["total_ms"],
+        "total_ms": record["total_ms"],
+        "wall_ms": wall_ms,
+        "exceptions": outcome["exceptions"],
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Lesson Play 첫 화면 시간 측정")
+    parser.add_argument("--runs", type=int, default=3, help="요약 페이지 첫 실행을 잴 횟수 (매번 새 프로세스)")
+    parser.add_argument("--out", default="startup_results.json", help="결과 JSON 경로")
+    args = parser.parse_args(argv)
+
+    imports = measure_imports()
+    print("📦 import (ms)")
+    for name, ms in imports.items():
+        print(f"   {name:<26} {ms:>8.1f}")
+
+    renders = []
+    print("🖥️ 요약 페이지 첫 실행 (ms)")
+    for n in range(1, args.runs + 1):
+        render = measure_first_render()
+        render["run"] = n
+        renders.append(render)
+        print(f"   #{n} 부트스트랩 {'있음' if render['bootstrap'] else '없음'}  "
+              f"첫 화면 {render['first_paint_ms']}  전체 {render['total_ms']}  (프로세스 {render['wall_ms']})")
+        for error in render["exceptions"]:
+            print(f"   ⚠️ {error}")
+
+    meta = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "started": datetime.datetime.now().isoformat(timespec="seconds"),
+    }
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump({"meta": meta, "imports_ms": imports, "renders": renders}, f, ensure_ascii=False, indent=1)
+        f.write("\n")
+    print(f"✅ {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,149 @@
+"""세션 요약 표 (회차·High/Low 포함)
+
+세션 인덱스에 회차와 High/Low를 붙인 요약 표를 만들고, data/.cache/summary.parquet에 저장해 둡니다.
+저장 파일에는 만든 시점의 데이터 버전(인덱스 버전 + highlow.csv 버전)을 적어 두어서,
+전사 CSV나 highlow.csv가 바뀐 경우에만 다시 씁니다. 진행 추이 페이지들은 load_summary()로 읽습니다.
+"""
+import os
+import uuid
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from lessonplay.dedup import find_duplicates
+from lessonplay.highlow import HIGHLOW_PATH, attach_highlow, highlow_version
+from lessonplay.session_index import CACHE_DIR, SUMMARY_COLUMNS, index_version, shared_index
+from lessonplay.shared_cache import get_shared
+
+SUMMARY_PATH = os.path.join(CACHE_DIR, "summary.parquet")
+
+# 예전 summary.csv와 같은 컬럼 순서 (+ session_id)
+SUMMARY_TABLE_COLUMNS = [
+    "수업", "날짜", "시간", "시나리오", "사용자", "회차",
+    "입력 수", "발문 수", "설명 수", "High", "Low", "피드백 유무", "파일 경로", "session_id", "중복 원본",
+]
+
+_VERSION_KEY = b"lessonplay.data_version"
+# 요약 표를 만드는 규칙(회차·중복 판정)이 바뀌면 올림 — 저장된 요약 파일을 다시 씀
+SUMMARY_VERSION = 2
+
+
+def current_version(index_df: pd.DataFrame, highlow_path: str = HIGHLOW_PATH) -> str:
+    """요약 표의 데이터 버전 — 인덱스 내용과 highlow.csv의 (mtime, 크기)가 같으면 같은 값"""
+    return f"{index_version(index_df)}|highlow-{highlow_version(highlow_path)}|summary-{SUMMARY_VERSION}"
+
+
+def build_summary(index_df: pd.DataFrame, highlow_path: str = HIGHLOW_PATH):
+    """세션 인덱스 → (요약 표, highlow 매칭 보고)
+
+    (수업, 날짜, 사용자)별로 시간 순서에 따라 회차를 매기고, index는 1부터 다시 부여합니다.
+    거의 같은 세션(lessonplay.dedup)은 '중복 원본'에 원본 파일 경로를 적고 회차를 세지 않습니다 (원본의 회차를 따름).
+    highlow.csv가 없으면 High/Low 컬럼 없이 (df, None)을 반환합니다.
+    """
+    df_all = index_df[SUMMARY_COLUMNS].copy()
+
+    # ✅ 거의 같은 세션 표시 (MinHash/LSH — 회차 계산 전)
+    duplicates = find_duplicates(index_df)
+    df_all["중복 원본"] = df_all["파일 경로"].map(duplicates["중복 원본"]).fillna("")
+    # 원본이 다른 날짜면 회차를 빌려 올 수 없으므로 별개의 세션으로 둠 (find_duplicates는 같은 날짜끼리만 묶음)
+    original_date = df_all["중복 원본"].map(df_all.set_index("파일 경로")["날짜"])
+    df_all.loc[original_date.notna() & (original_date != df_all["날짜"]), "중복 원본"] = ""
+
+    # ✅ 정렬 (회차 계산 전)
+    df_all = df_all.sort_values(
+        by=["수업", "날짜", "사용자", "시간"],
+        ascending=[True, True, True, True]
+    )
+
+    # ✅ (수업, 날짜, 사용자)별로 시간 순서에 따라 회차 부여 (원본 세션만 세고, 중복은 같은 날 원본의 회차)
+    is_original = (df_all["중복 원본"] == "").to_numpy()
+    df_all["회차"] = (
+        df_all[is_original].groupby(["수업", "날짜", "사용자"])
+                           .cumcount() + 1
+    )
+    original_round = df_all.loc[is_original].set_index("파일 경로")["회차"]
+    df_all.loc[~is_original, "회차"] = df_all.loc[~is_original, "중복 원본"].map(original_round)
+    df_all["회차"] = df_all["회차"].astype(int)
+
+    # 인덱스 다시 1부터 부여
+    df_all = df_all.reset_index(drop=True)
+    df_all.index = df_all.index + 1
+
+    # ✅ highlow.csv 매칭 (정규화 키 dict — highlow.csv가 바뀔 때만 다시 만듦)
+    return attach_highlow(df_all, highlow_path)
+
+
+def stored_version(path: str = SUMMARY_PATH):
+    """저장된 요약 파일의 데이터 버전 (없거나 읽을 수 없으면 None)"""
+    try:
+        metadata = pq.read_schema(path).metadata or {}
+    except (OSError, pa.ArrowInvalid):
+        return None
+    version = metadata.get(_VERSION_KEY)
+    return version.decode() if version else None
+
+
+def save_summary(df: pd.DataFrame, version: str, path: str = SUMMARY_PATH):
+    """요약 표를 데이터 버전과 함께 Parquet으로 씁니다 (임시 파일에 쓴 뒤 교체)."""
+    # highlow.csv가 없을 때도 읽는 쪽 컬럼이 같도록 High/Low는 0으로 채움
+    df = df.reindex(columns=SUMMARY_TABLE_COLUMNS)
+    df[["High", "Low"]] = df[["High", "Low"]].fillna(0).astype(int)
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    table = table.replace_schema_metadata({**(table.schema.metadata or {}), _VERSION_KEY: version.encode()})
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    pq.write_table(table, tmp_path)
+    os.replace(tmp_path, path)
+
+
+def materialize_summary(index_df: pd.DataFrame, highlow_path: str = HIGHLOW_PATH, path: str = SUMMARY_PATH,
+                        summary=None) -> bool:
+    """저장된 요약이 현재 데이터 버전과 다르면 다시 씁니다. 새로 썼으면 True.
+
+    summary: 이미 만든 build_summary() 결과 표가 있으면 넘겨서 다시 계산하지 않게 합니다.
+    """
+    version = current_version(index_df, highlow_path)
+    if stored_version(path) == version:
+        return False
+    if summary is None:
+        summary, _ = build_summary(index_df, highlow_path)
+    save_summary(summary, version, path)
+    return True
+
+
+def refresh_summary(highlow_path: str = HIGHLOW_PATH, path: str = SUMMARY_PATH):
+    """세션 인덱스를 디스크와 맞춘 뒤 요약 파일을 최신으로 만듭니다.
+
+    여러 세션이 동시에 불러도 인덱스 갱신과 요약 파일 쓰기는 데이터 버전마다 한 번만 합니다.
+    반환값: update_index()의 errors — [(파일명, 오류 메시지)]
+    """
+    index_df, errors, _ = shared_index()
+    if not index_df.empty:
+        version = current_version(index_df, highlow_path)
+        get_shared(("summary_file", path), version, lambda: materialize_summary(index_df, highlow_path, path))
+    return errors
+
+
+def load_summary(path: str = SUMMARY_PATH, min_inputs: int = 1, drop_duplicates: bool = True):
+    """저장된 요약 표를 읽어 입력 수가 min_inputs 이상인 행만 돌려줍니다. 파일이 없으면 None.
+
+    drop_duplicates: 거의 같은 세션('중복 원본'이 있는 행)을 빼고 원본만 남김
+
+    같은 (mtime, 크기)면 프로세스 공유 캐시(lessonplay.shared_cache)의 프레임을 그대로 돌려주므로,
+    받은 쪽에서 고치지 말고 assign/copy로 새 프레임을 만들어 쓰세요.
+    """
+    try:
+        st_ = os.stat(path)
+    except OSError:
+        return None
+
+    def read():
+        df = pq.read_table(path, memory_map=True).to_pandas()
+        keep = df["입력 수"] >= min_inputs
+        if drop_duplicates and "중복 원본" in df:
+            keep &= df["중복 원본"].fillna("") == ""
+        return df[keep].reset_index(drop=True)
+
+    return get_shared(("summary", path, min_inputs, drop_duplicates), (st_.st_mtime_ns, st_.st_size), read)
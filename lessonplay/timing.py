@@ -0,0 +1,108 @@
+"""단계별 시간 측정
+
+페이지가 한 번 실행(rerun)될 때마다 start_run()으로 기록을 시작하고, 느릴 만한 구간을 stage()로 감쌉니다.
+기록은 (단계, 시작 시각(실행 시작부터), 걸린 시간, 처리한 행 수, 메모리 변화)이고, show_timing_panel()이 사이드바에 보여 준 뒤
+data/.cache/timings.jsonl 에 한 줄씩 덧붙입니다. start_run()을 부르지 않은 스레드(작업 프로세스, CLI 등)에서는
+stage()가 아무것도 기록하지 않습니다.
+"""
+import datetime
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# 첫 화면 전에 불러오는 모듈이라 pandas를 끌고 오는 lessonplay.ingest(BASE_DIR)는 쓰지 않음
+TIMING_LOG_PATH = os.path.join("data", ".cache", "timings.jsonl")
+# 로그가 이 크기를 넘으면 timings.jsonl.1 로 돌려 놓고 새로 씁니다.
+TIMING_LOG_MAX_BYTES = 5 * 1024 * 1024
+
+_local = threading.local()
+_log_lock = threading.Lock()
+
+
+def _rss_kb():
+    """현재 RSS (KB) — /proc가 없는 OS에서는 None"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") // 1024
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def start_run(page: str):
+    """이번 실행의 기록을 새로 시작합니다 (페이지 맨 위에서 한 번)."""
+    _local.run = {"page": page, "started": time.perf_counter(), "stages": [], "depth": 0}
+
+
+@contextmanager
+def stage(name: str, rows=None):
+    """with 블록을 한 단계로 기록합니다. 블록 안에서 `s["rows"] = len(df)`처럼 처리한 행 수를 적을 수 있습니다."""
+    run = getattr(_local, "run", None)
+    handle = {"rows": rows}
+    if run is None:
+        yield handle
+        return
+
+    record = {"stage": name, "depth": run["depth"]}
+    run["stages"].append(record)  # 바깥 단계가 안쪽 단계보다 먼저 나오게 미리 넣어 둠
+    run["depth"] += 1
+    rss_before = _rss_kb()
+    start = time.perf_counter()
+    record["at_ms"] = round((start - run["started"]) * 1000, 1)
+    try:
+        yield handle
+    finally:
+        record["ms"] = round((time.perf_counter() - start) * 1000, 1)
+        rss_after = _rss_kb()
+        record["rows"] = handle["rows"]
+        record["mem_delta_kb"] = rss_after - rss_before if rss_before is not None and rss_after is not None else None
+        run["depth"] -= 1
+
+
+def finish_run(log_path: str = TIMING_LOG_PATH):
+    """이번 실행의 기록을 끝내고 JSON-lines 로그에 덧붙입니다. 반환값: 기록 dict (시작하지 않았으면 None)"""
+    run = getattr(_local, "run", None)
+    if run is None:
+        return None
+    _local.run = None
+    record = {
+        "ts": datetime.datetime.now().isoformat(timespec="seconds"),
+        "page": run["page"],
+        "total_ms": round((time.perf_counter() - run["started"]) * 1000, 1),
+        "stages": run["stages"],
+    }
+    try:
+        with _log_lock:
+            os.makedirs(os.path.dirname(log_path), exist_ok=True)
+            if os.path.exists(log_path) and os.path.getsize(log_path) > TIMING_LOG_MAX_BYTES:
+                os.replace(log_path, log_path + ".1")
+            with open(log_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    except OSError:
+        pass  # 로그를 못 써도 화면은 계속
+    return record
+
+
+def show_timing_panel(log_path: str = TIMING_LOG_PATH):
+    """기록을 끝내고, 사이드바 토글이 켜져 있으면 단계별 시간 표를 보여 줍니다 (페이지 맨 끝에서 한 번)."""
+    import pandas as pd
+    import streamlit as st
+
+    record = finish_run(log_path)
+    if record is None:
+        return
+    if not st.sidebar.toggle("⏱️ 단계별 시간 보기", key="timing_panel"):
+        return
+    with st.sidebar:
+        st.caption(f"이번 실행: {record['total_ms']:.0f} ms")
+        if record["stages"]:
+            table = pd.DataFrame(record["stages"])
+            table["stage"] = [" " * d + ("↳ " if d else "") + s for d, s in zip(table["depth"], table["stage"])]
+            st.dataframe(
+                table[["stage", "ms", "rows", "mem_delta_kb"]].rename(
+                    columns={"stage": "단계", "rows": "행 수", "mem_delta_kb": "메모리 Δ(KB)"}
+                ),
+                hide_index=True,
+            )
+        st.caption(f"모든 실행 기록: {log_path}")
@@ -0,0 +1,158 @@
+"""전사 CSV ZIP 일괄 가져오기
+
+내보낸 CSV를 묶은 ZIP을 받아서
+1) 파일을 하나씩 블록 단위로 임시 폴더(data/.cache/upload-*)에 풀고 (ZIP 전체를 메모리에 풀지 않음)
+2) 여러 프로세스에서 CSV 머리줄('사용자,날짜/시간,화자,메시지')과 첫 발화의 날짜를 확인한 뒤
+3) data/<수업>/<YYMMDD>/ 로 옮깁니다.
+수업은 ZIP 안 경로에 Rehearsal/TeachingMethod 폴더가 있으면 그것을, 없으면 화면에서 고른 값을 씁니다.
+같은 이름의 파일이 이미 있으면 내용이 같을 때는 건너뛰고, 다르면 덮어쓰지 않고 오류로 남깁니다.
+"""
+import csv
+import filecmp
+import os
+import shutil
+import uuid
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+
+from lessonplay.dates import parse_datetime_from_filename, parse_korean_datetime
+from lessonplay.ingest import BASE_DIR, FOLDERS, PARALLEL_MIN_FILES
+
+EXPECTED_HEADER = ["사용자", "날짜/시간", "화자", "메시지"]
+
+# ZIP 멤버를 풀 때 한 번에 복사하는 크기
+COPY_BUFFER = 1024 * 1024
+
+
+def _member_name(info: zipfile.ZipInfo) -> str:
+    """UTF-8 표시가 없는 ZIP(Windows 탐색기 등)의 한글 이름은 cp437로 잘못 읽히므로 cp949로 다시 읽음"""
+    name = info.filename
+    if not info.flag_bits & 0x800:
+        try:
+            name = name.encode("cp437").decode("cp949")
+        except (UnicodeEncodeError, UnicodeDecodeError):
+            pass
+    return name.replace("\\", "/")
+
+
+def _lesson_of(member: str, default: str):
+    """ZIP 안 경로에서 수업 폴더 이름을 찾음 (대소문자 무시) — 없으면 default"""
+    for part in member.split("/")[:-1]:
+        for folder in FOLDERS:
+            if part.lower() == folder.lower():
+                return folder
+    return default
+
+
+def csv_members(zf: zipfile.ZipFile) -> list:
+    """ZIP 안의 CSV 멤버 목록 [(ZipInfo, 표시 이름)] — 폴더, macOS 부속 파일은 뺌"""
+    members = []
+    for info in zf.infolist():
+        name = _member_name(info)
+        base = os.path.basename(name)
+        if info.is_dir() or not base.lower().endswith(".csv") or base.startswith("._") or "__MACOSX/" in name:
+            continue
+        members.append((info, name))
+    return members
+
+
+# ---------------------------
+# ① 확인 (작업 프로세스에서 실행)
+# ---------------------------
+def validate_csv(path: str, name: str) -> dict:
+    """풀어 놓은 CSV 하나 확인 → {"ok", "오류", "날짜"('YYYY-MM-DD')}
+
+    머리줄이 EXPECTED_HEADER로 시작하고, 첫 발화 행이 있어야 합니다.
+    날짜는 첫 발화의 '날짜/시간' → 파일명 순으로 읽습니다.
+    """
+    try:
+        with open(path, encoding="utf-8-sig", newline="") as f:
+            reader = csv.reader(f)
+            header = next(reader, None)
+            first = next(reader, None)
+    except (OSError, UnicodeDecodeError, csv.Error) as e:
+        return {"ok": False, "오류": f"읽을 수 없음: {e}", "날짜": ""}
+    if header is None or [h.strip() for h in header[:len(EXPECTED_HEADER)]] != EXPECTED_HEADER:
+        return {"ok": False, "오류": f"머리줄이 {','.join(EXPECTED_HEADER)} 가 아님", "날짜": ""}
+    if first is None or len(first) < len(EXPECTED_HEADER):
+        return {"ok": False, "오류": "발화 행이 없음", "날짜": ""}
+    date, _ = parse_korean_datetime(first[1])
+    if not date:
+        date, _ = parse_datetime_from_filename(name)
+    if not date:
+        return {"ok": False, "오류": "날짜를 알 수 없음", "날짜": ""}
+    return {"ok": True, "오류": None, "날짜": date}
+
+
+def _validate_one(args):
+    return validate_csv(*args)
+
+
+# ---------------------------
+# ② 가져오기
+# ---------------------------
+def import_zip(zip_file, default_lesson: str = FOLDERS[0], base_dir: str = BASE_DIR,
+               progress=None, max_workers=None) -> dict:
+    """ZIP의 CSV를 검사해서 data/<수업>/<YYMMDD>/ 로 옮깁니다.
+
+    zip_file: 경로 또는 읽을 수 있는 바이너리 파일 객체 (Streamlit UploadedFile 등)
+    progress: progress(단계 이름, 끝난 수, 전체 수)를 받는 함수 (없으면 무시)
+    반환 dict: {"imported": [새로 넣은 경로], "skipped": [이미 같은 파일이 있던 경로], "errors": [(ZIP 안 이름, 이유)]}
+    """
+    progress = progress or (lambda stage, done, total: None)
+    staging = os.path.join(base_dir, ".cache", f"upload-{uuid.uuid4().hex}")
+    os.makedirs(staging, exist_ok=True)
+    try:
+        # 1) 블록 단위로 풀기
+        staged = []
+        with zipfile.ZipFile(zip_file) as zf:
+            members = csv_members(zf)
+            for n, (info, name) in enumerate(members, 1):
+                path = os.path.join(staging, f"{n:06d}.csv")
+                with zf.open(info) as src, open(path, "wb") as dst:
+                    shutil.copyfileobj(src, dst, COPY_BUFFER)
+                staged.append((path, name))
+                progress("압축 풀기", n, len(members))
+
+        # 2) 머리줄·날짜 확인 (파일이 많으면 여러 프로세스)
+        jobs = staged
+        workers = max_workers or os.cpu_count() or 1
+        checks = []
+        if workers > 1 and len(jobs) >= PARALLEL_MIN_FILES:
+            chunksize = max(1, len(jobs) // (workers * 4))
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                for check in pool.map(_validate_one, jobs, chunksize=chunksize):
+                    checks.append(check)
+                    progress("CSV 확인", len(checks), len(jobs))
+        else:
+            for job in jobs:
+                checks.append(_validate_one(job))
+                progress("CSV 확인", len(checks), len(jobs))
+
+        # 3) data/<수업>/<YYMMDD>/ 로 옮기기
+        imported, skipped, errors = [], [], []
+        taken = set()
+        for n, ((path, name), check) in enumerate(zip(staged, checks), 1):
+            progress("폴더로 옮기기", n, len(staged))
+            if not check["ok"]:
+                errors.append((name, check["오류"]))
+                continue
+            yymmdd = check["날짜"].replace("-", "")[2:]
+            target_dir = os.path.join(base_dir, _lesson_of(name, default_lesson), yymmdd)
+            target = os.path.join(target_dir, os.path.basename(name))
+            if target in taken:
+                errors.append((name, "ZIP 안에 같은 이름의 파일이 또 있음"))
+                continue
+            if os.path.exists(target):
+                if filecmp.cmp(path, target, shallow=False):
+                    skipped.append(target)
+                else:
+                    errors.append((name, f"{target}에 내용이 다른 같은 이름의 파일이 있음 (덮어쓰지 않음)"))
+                continue
+            os.makedirs(target_dir, exist_ok=True)
+            os.replace(path, target)
+            imported.append(target)
+            taken.add(target)
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+    return {"imported": imported, "skipped": skipped, "errors": errors}
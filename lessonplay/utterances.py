@@ -0,0 +1,197 @@
+"""발화 단위 Parquet 저장소
+
+전사 CSV의 모든 발화를 한 행씩 Parquet에 모아 둡니다. data/<수업>/<날짜폴더> 하나가 파티션 파일 하나가 되고,
+반복되는 값(사용자, 날짜, 수업, 시나리오, 세션, 화자)은 categorical(딕셔너리 인코딩)로 저장합니다.
+원본 CSV의 (mtime, 크기)가 바뀐 파일이 속한 파티션만 다시 씁니다.
+
+분석용으로 코딩된 CSV(data/analysis-*/)도 read_coded_csv()로 같은 캐시 폴더에 Parquet 사본을 만들어 읽습니다.
+"""
+import json
+import os
+import uuid
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from lessonplay.ingest import BASE_DIR, ingest, scan_files, summary_frame
+from lessonplay.metrics import session_scenarios
+from lessonplay.timing import stage
+
+CACHE_DIR = os.path.join(BASE_DIR, ".cache")
+
+# 저장 형식이 바뀌면 버전을 올립니다 (새 폴더에 처음부터 다시 만듦).
+STORE_VERSION = 2
+STORE_DIR = os.path.join(CACHE_DIR, f"utterances_v{STORE_VERSION}")
+SOURCES_PATH = os.path.join(STORE_DIR, "_sources.json")
+CODED_DIR = os.path.join(CACHE_DIR, "coded")
+
+UTTERANCE_COLUMNS = ["수업", "날짜", "사용자", "시나리오", "파일 경로", "turn", "화자", "메시지"]
+CATEGORY_COLUMNS = ["수업", "날짜", "사용자", "시나리오", "파일 경로", "화자"]
+
+
+def partition_of(file_path: str, base_dir: str = BASE_DIR) -> str:
+    """CSV가 속한 파티션 이름 — base_dir 기준 상위 폴더 경로 (예: 'Rehearsal/250911')"""
+    return os.path.relpath(os.path.dirname(file_path), base_dir).replace(os.sep, "/")
+
+
+def _partition_path(partition: str, store_dir: str) -> str:
+    return os.path.join(store_dir, *partition.split("/")) + ".parquet"
+
+
+def _atomic_write_table(table: pa.Table, path: str):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    pq.write_table(table, tmp_path)
+    os.replace(tmp_path, path)
+
+
+def utterance_frame(results) -> pd.DataFrame:
+    """ingest(with_messages=True) 결과 → 발화 단위 프레임 (헤더 행 제외, turn은 CSV 안의 행 번호)"""
+    frames = []
+    summaries = summary_frame(results).set_index("파일 경로")
+    for result in results:
+        if result["speakers"] is None:
+            continue
+        summary = summaries.loc[result["파일 경로"]]
+        n = len(result["speakers"]) - 1
+        if n <= 0:
+            continue
+        frames.append(pd.DataFrame({
+            "수업": summary["수업"],
+            "날짜": summary["날짜"],
+            "사용자": summary["사용자"],
+            "파일 경로": result["파일 경로"],
+            "turn": pd.RangeIndex(1, n + 1).astype("int32"),
+            "화자": result["speakers"][1:],
+            "메시지": result["messages"][1:],
+        }))
+    if not frames:
+        df = pd.DataFrame({c: pd.Series(dtype=object) for c in UTTERANCE_COLUMNS})
+        df["turn"] = df["turn"].astype("int32")
+    else:
+        df = pd.concat(frames, ignore_index=True)
+        # 시나리오는 세션 첫 발화로 한 번에 분류
+        df["시나리오"] = df["파일 경로"].map(session_scenarios(df)).fillna("")
+    df = df[UTTERANCE_COLUMNS]
+    for col in CATEGORY_COLUMNS:
+        df[col] = df[col].astype("category")
+    return df
+
+
+def _load_sources(path: str) -> dict:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_sources(sources: dict, path: str):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(sources, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def update_store(found=None, rebuild: bool = False, base_dir: str = BASE_DIR, store_dir: str = STORE_DIR):
+    """저장소를 디스크 상태와 맞춥니다.
+
+    found: scan_files() 결과 (없으면 직접 스캔)
+    반환값: (results, new_rows, errors, stats)
+    - results: 이번에 새로 파싱한 파일의 ingest() 결과 — 세션 인덱스가 같은 파싱 결과를 재사용합니다.
+    - new_rows: results의 발화 프레임 (utterance_frame(results))
+    - errors: ingest()와 같은 오류 dict 리스트
+    - stats: {"parsed", "removed", "partitions"} 개수
+    """
+    if found is None:
+        found = scan_files(base_dir)
+    sources_path = os.path.join(store_dir, os.path.basename(SOURCES_PATH))
+    sources = {} if rebuild else _load_sources(sources_path)
+
+    changed = [
+        (folder, p) for p, (folder, mtime_ns, size) in found.items()
+        if sources.get(p, {}).get("fingerprint") != [mtime_ns, size]
+    ]
+    deleted = [p for p in sources if p not in found]
+
+    with stage("CSV 읽기 (read_csv)", rows=len(changed)):
+        results, errors = ingest(changed, with_messages=True)
+
+    # 영향을 받는 파티션만 다시 씀
+    dirty = {partition_of(p, base_dir) for _, p in changed} | {sources[p]["partition"] for p in deleted}
+    if rebuild:
+        dirty |= {partition_of(p, base_dir) for p in found}
+    stale = {p for _, p in changed} | set(deleted)
+    new_rows = utterance_frame(results)
+    # categorical에 map을 쓰면 세션(카테고리)마다 한 번만 계산됨
+    new_partitions = new_rows["파일 경로"].map(lambda p: partition_of(p, base_dir))
+
+    with stage("파티션 쓰기 (Parquet)", rows=len(dirty)):
+        for partition in dirty:
+            path = _partition_path(partition, store_dir)
+            parts = []
+            if not rebuild and os.path.exists(path):
+                kept = pq.read_table(path).to_pandas()
+                kept = kept[~kept["파일 경로"].isin(stale)]
+                if not kept.empty:
+                    parts.append(kept)
+            fresh = new_rows[(new_partitions == partition).to_numpy(dtype=bool)]
+            if not fresh.empty:
+                parts.append(fresh)
+
+            if not parts:
+                if os.path.exists(path):
+                    os.remove(path)
+                continue
+            df = pd.concat([part.astype({c: object for c in CATEGORY_COLUMNS}) for part in parts], ignore_index=True)
+            for col in CATEGORY_COLUMNS:
+                df[col] = df[col].astype("category")
+            _atomic_write_table(pa.Table.from_pandas(df[UTTERANCE_COLUMNS], preserve_index=False), path)
+
+    for p in stale:
+        sources.pop(p, None)
+    for result in results:
+        p = result["파일 경로"]
+        _, mtime_ns, size = found[p]
+        sources[p] = {"fingerprint": [mtime_ns, size], "partition": partition_of(p, base_dir)}
+    if changed or deleted or not os.path.exists(sources_path):
+        _save_sources(sources, sources_path)
+
+    stats = {"parsed": len(results), "removed": len(deleted), "partitions": len(dirty)}
+    return results, new_rows, errors, stats
+
+
+def store_tables(columns=None, lessons=None, store_dir: str = STORE_DIR) -> list:
+    """저장소의 파티션 파일들을 Arrow 표 목록으로 읽습니다 (메모리 매핑, pandas 변환 없음)."""
+    columns = columns or UTTERANCE_COLUMNS
+    tables = []
+    if os.path.isdir(store_dir):
+        for lesson in sorted(os.listdir(store_dir)):
+            lesson_dir = os.path.join(store_dir, lesson)
+            if not os.path.isdir(lesson_dir) or (lessons and lesson not in lessons):
+                continue
+            for root, dirs, files in os.walk(lesson_dir):
+                for file in sorted(files):
+                    if file.endswith(".parquet"):
+                        tables.append(pq.read_table(os.path.join(root, file), columns=columns, memory_map=True))
+    return tables
+
+
+def read_coded_csv(csv_path: str, cache_dir: str = CODED_DIR) -> pd.DataFrame:
+    """분석용 코딩 CSV를 dtype=str로 읽되, 같은 (mtime, 크기)의 Parquet 사본이 있으면 그것을 읽습니다."""
+    st_ = os.stat(csv_path)
+    name = os.path.splitext(os.path.basename(csv_path))[0]
+    cache_path = os.path.join(cache_dir, f"{name}.{st_.st_mtime_ns}.{st_.st_size}.parquet")
+    if os.path.exists(cache_path):
+        return pq.read_table(cache_path, memory_map=True).to_pandas()
+
+    df = pd.read_csv(csv_path, dtype=str)
+    # 같은 CSV의 예전 사본 정리
+    if os.path.isdir(cache_dir):
+        for old in os.listdir(cache_dir):
+            if old.startswith(f"{name}.") and old.endswith(".parquet"):
+                os.remove(os.path.join(cache_dir, old))
+    _atomic_write_table(pa.Table.from_pandas(df, preserve_index=False), cache_path)
+    return df
@@ -0,0 +1,98 @@
+"""data 폴더 감시 (실시간 갱신)
+
+watchdog으로 data/Rehearsal, data/TeachingMethod 아래 CSV의 생성·수정·삭제·이동을 받아서
+바뀐 파일 경로를 모아 둡니다. 감시기는 프로세스에 하나만 띄우고 모든 세션이 같이 씁니다.
+
+- take_changes(): 모인 경로를 꺼냅니다 → update_index(changed=...)로 그 파일만 다시 읽음
+  (감시를 막 시작했거나 이벤트를 놓쳤을 수 있으면 None → 전체 스캔)
+- watch_generation(): 이벤트가 올 때마다 1씩 늘어나는 번호 — 화면은 이 값이 바뀌면 다시 실행(rerun)합니다.
+
+watchdog이 없으면 start_watcher()가 False를 돌려주고, 화면은 예전처럼 실행할 때마다 전체 스캔합니다.
+"""
+import os
+import threading
+
+from lessonplay.ingest import BASE_DIR, FOLDERS
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:  # watchdog은 Streamlit과 함께 설치되지만, 없으면 실시간 갱신만 끔
+    FileSystemEventHandler = object
+    Observer = None
+
+_lock = threading.Lock()
+_state = {
+    "observer": None,
+    "base_dir": None,
+    "pending": set(),
+    "full_scan": True,  # 감시 시작 전의 변경은 모르므로 첫 갱신은 전체 스캔
+    "generation": 0,
+}
+
+
+def _is_transcript(path: str, base_dir: str) -> bool:
+    rel = os.path.relpath(path, base_dir).split(os.sep)
+    return len(rel) >= 2 and rel[0] in FOLDERS and path.endswith(".csv")
+
+
+class _Handler(FileSystemEventHandler):
+    """CSV 이벤트만 골라 pending에 넣습니다 (폴더 이벤트는 폴더 안 파일을 다 알 수 없으므로 전체 스캔)."""
+
+    def __init__(self, base_dir: str):
+        self.base_dir = base_dir
+
+    def on_any_event(self, event):
+        if event.event_type not in ("created", "modified", "deleted", "moved", "closed"):
+            return
+        paths = [os.fsdecode(event.src_path)]
+        if getattr(event, "dest_path", ""):
+            paths.append(os.fsdecode(event.dest_path))
+        with _lock:
+            if event.is_directory:
+                if event.event_type in ("deleted", "moved"):
+                    _state["full_scan"] = True
+                    _state["generation"] += 1
+                return
+            relevant = [p for p in paths if _is_transcript(p, self.base_dir)]
+            if not relevant:
+                return
+            _state["pending"].update(os.path.join(self.base_dir, os.path.relpath(p, self.base_dir))
+                                     for p in relevant)
+            _state["generation"] += 1
+
+
+def start_watcher(base_dir: str = BASE_DIR) -> bool:
+    """감시기를 (아직 없으면) 띄웁니다. 반환값: 감시 중인지"""
+    if Observer is None or not os.path.isdir(base_dir):
+        return False
+    with _lock:
+        observer = _state["observer"]
+        if observer is not None and observer.is_alive() and _state["base_dir"] == base_dir:
+            return True
+        observer = Observer()
+        observer.schedule(_Handler(base_dir), base_dir, recursive=True)
+        observer.daemon = True
+        observer.start()
+        _state.update(observer=observer, base_dir=base_dir, pending=set(), full_scan=True)
+    return True
+
+
+def watching() -> bool:
+    observer = _state["observer"]
+    return observer is not None and observer.is_alive()
+
+
+def watch_generation() -> int:
+    return _state["generation"]
+
+
+def take_changes():
+    """모인 CSV 경로(set)를 꺼내고 비웁니다. 전체 스캔이 필요하면 None."""
+    with _lock:
+        if not watching() or _state["full_scan"]:
+            _state["full_scan"] = False
+            _state["pending"] = set()
+            return None
+        changed, _state["pending"] = _state["pending"], set()
+    return changed
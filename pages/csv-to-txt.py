@@ -1,98 +1,86 @@
 import streamlit as st
 import pandas as pd
 import os
-import zipfile
-import io
+import tempfile
+
+from lessonplay.convert import (
+    OUTPUT_DIR,
+    convert_all_csv_to_txt,
+    stream_convert_csv_to_txt,
+    sync_csv_to_txt,
+    zip_files,
+)
+from lessonplay.search import update_search_index
+from lessonplay.timing import show_timing_panel, stage, start_run
 
 st.set_page_config(page_title="CSV → TXT 변환 도구", layout="wide")
 st.title("📝 CSV → TXT 변환 도구")
+start_run("CSV → TXT")
 
-BASE_DIR = "data"
-folders = ["Rehearsal", "TeachingMethod"]
-output_dir = "converted_txt"
+output_dir = OUTPUT_DIR
 os.makedirs(output_dir, exist_ok=True)
 
-def convert_all_csv_to_txt():
-    """data 폴더 내 모든 CSV → TXT 변환"""
-    converted_files = []
-    error_files = []
-
-    for folder in folders:
-        root_path = os.path.join(BASE_DIR, folder)
-        if not os.path.exists(root_path):
-            continue
-
-        for root, dirs, files in os.walk(root_path):
-            for file in files:
-                if not file.endswith(".csv"):
-                    continue
-
-                file_path = os.path.join(root, file)
-                try:
-                    df = pd.read_csv(file_path, header=None)
-                except Exception as e:
-                    error_files.append((file, str(e)))
-                    continue
-
-                # 화자열(index 2), 메시지열(index 3)
-                if df.shape[1] < 4:
-                    error_files.append((file, "열 구조 부족"))
-                    continue
-
-                speaker_col = df.iloc[:, 2].astype(str)
-                message_col = df.iloc[:, 3].astype(str)
-
-                # 텍스트 조합
-                lines = []
-                for s, m in zip(speaker_col, message_col):
-                    if s.strip() or m.strip():
-                        lines.append(f"[{s}] {m}")
-
-                # TXT 파일 저장 (파일명 동일)
-                txt_filename = os.path.splitext(file)[0] + ".txt"
-                txt_path = os.path.join(output_dir, txt_filename)
-                with open(txt_path, "w", encoding="utf-8") as f:
-                    f.write("\n".join(lines))
-
-                converted_files.append(txt_path)
-
-    return converted_files, error_files
-
+incremental = st.checkbox(
+    "⚡ 증분 모드 (새로 생기거나 바뀐 CSV만 변환)",
+    value=True,
+    help="이전 변환 기록과 비교해서 바뀐 파일만 다시 만들고, 원본이 사라진 TXT는 지웁니다.",
+)
+streaming = st.checkbox(
+    "🌊 스트리밍 모드 (메모리 절약)",
+    help="CSV를 조금씩 읽어 TXT와 ZIP에 바로 씁니다. 파일이 아주 많을 때 메모리 사용량이 일정하게 유지됩니다.",
+)
 
 # -----------------------------
 # 🚀 실행 버튼
 # -----------------------------
 if st.button("🚀 CSV → TXT 변환 시작"):
-    with st.spinner("CSV 파일을 TXT로 변환 중입니다..."):
-        converted_files, error_files = convert_all_csv_to_txt()
-
-    # 결과 출력
-    st.success(f"✅ 변환 완료! 총 {len(converted_files)}개 파일이 생성되었습니다.")
-    st.write("**출력 폴더:**", output_dir)
-
-    if converted_files:
-        # 변환된 파일 목록 표시
-        st.dataframe(pd.DataFrame({"생성된 TXT 파일": [os.path.basename(f) for f in converted_files]}))
-
-        # -----------------------------
-        # 📦 ZIP 파일로 압축 및 다운로드
-        # -----------------------------
-        zip_buffer = io.BytesIO()
-        with zipfile.ZipFile(zip_buffer, "w", zipfile.ZIP_DEFLATED) as zipf:
-            for fpath in converted_files:
-                zipf.write(fpath, arcname=os.path.basename(fpath))
-        zip_buffer.seek(0)
-
-        st.download_button(
-            label="📥 변환된 TXT 파일 ZIP 다운로드",
-            data=zip_buffer,
-            file_name="converted_txt_files.zip",
-            mime="application/zip"
-        )
-
-    # 변환 실패 파일 표시
-    if error_files:
-        st.subheader("⚠️ 변환 실패 파일")
-        st.dataframe(pd.DataFrame(error_files, columns=["파일명", "오류"]))
+    # ZIP은 메모리가 아니라 임시 파일에 만듭니다. (download_button은 버퍼 없는 파일 객체만 받음)
+    # download_button이 호출될 때 내용을 읽어 가므로, 이 블록이 끝나면 임시 파일을 닫아도 됨
+    with tempfile.TemporaryFile(buffering=0) as zip_file:
+        with st.spinner("CSV 파일을 TXT로 변환 중입니다..."), stage("CSV → TXT 변환·ZIP") as s:
+            if incremental:
+                report = sync_csv_to_txt(zip_file, streaming=streaming)
+                converted_files, error_files = report["converted"], report["errors"]
+            elif streaming:
+                converted_files, error_files = stream_convert_csv_to_txt(zip_file)
+            else:
+                converted_files, error_files = convert_all_csv_to_txt()
+                zip_files(converted_files, zip_file)
+            s["rows"] = len(converted_files)
+        # ✅ 검색 페이지가 바로 새 TXT를 찾도록 검색 색인도 갱신 (바뀐 TXT만 다시 읽음)
+        with stage("검색 색인 갱신"):
+            update_search_index()
+        zip_file.seek(0)
+
+        # 결과 출력
+        if incremental:
+            st.success(
+                f"✅ 변환 완료! 변환 {len(converted_files)}개 · "
+                f"건너뜀 {len(report['skipped'])}개 · 삭제 {len(report['removed'])}개"
+            )
+        else:
+            st.success(f"✅ 변환 완료! 총 {len(converted_files)}개 파일이 생성되었습니다.")
+        st.write("**출력 폴더:**", output_dir)
+
+        if converted_files:
+            # 변환된 파일 목록 표시
+            st.dataframe(pd.DataFrame({"생성된 TXT 파일": [os.path.basename(f) for f in converted_files]}))
+
+            # -----------------------------
+            # 📦 ZIP 파일 다운로드
+            # -----------------------------
+            st.download_button(
+                label="📥 변환된 TXT 파일 ZIP 다운로드",
+                data=zip_file,
+                file_name="converted_txt_files.zip",
+                mime="application/zip"
+            )
+
+        # 변환 실패 파일 표시
+        if error_files:
+            st.subheader("⚠️ 변환 실패 파일")
+            st.dataframe(pd.DataFrame(error_files, columns=["파일명", "오류"]))
 else:
     st.info("📂 'CSV → TXT 변환 시작' 버튼을 눌러 변환을 실행하세요.")
+
+show_timing_panel()
@@ -1,21 +1,26 @@
 import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
-import os
+
+from lessonplay.summary import load_summary, refresh_summary
+from lessonplay.timing import show_timing_panel, stage, start_run
 
 st.set_page_config(page_title="High–Low 변화 분석", layout="wide")
 st.title("📈 사용자별 High–Low & 입력 수 변화 추이 (시나리오별)")
+start_run("High–Low·입력 수 변화")
 
-DATA_PATH = "data/summary.csv"
-
-if not os.path.exists(DATA_PATH):
-    st.warning("⚠️ summary.csv 파일이 없습니다. 먼저 데이터 정리 페이지에서 생성하세요.")
-else:
-    df = pd.read_csv(DATA_PATH)
+# ✅ 전사 CSV가 바뀌었으면 세션 인덱스와 요약 파일(data/.cache/summary.parquet)을 먼저 갱신
+with stage("요약 갱신"):
+    refresh_summary()
 
-    # ✅ 입력 수가 0인 데이터 제외
-    df = df[df["입력 수"] > 0]
+# ✅ 입력 수가 0인 데이터는 제외된 요약 표 (파일이 바뀔 때만 다시 읽음 — 공유 프레임이므로 직접 고치지 않음)
+with stage("요약 읽기") as s:
+    df = load_summary()
+    s["rows"] = None if df is None else len(df)
 
+if df is None:
+    st.warning("⚠️ 요약 데이터가 없습니다. data 폴더에 전사 CSV 파일이 있는지 확인하세요.")
+else:
     # ✅ 사용자 선택 드롭다운
     users = sorted(df["사용자"].dropna().unique().tolist())
     selected_user = st.selectbox("👤 사용자 선택", users)
@@ -89,4 +94,7 @@ else:
             margin=dict(l=40, r=40, t=60, b=80),
         )
 
-        st.plotly_chart(fig, use_container_width=True)
+        with stage("그래프 전송 (Plotly 직렬화)"):
+            st.plotly_chart(fig, use_container_width=True)
+
+show_timing_panel()
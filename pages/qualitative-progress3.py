@@ -1,23 +1,51 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import plotly.graph_objects as go
-import os
+
+from lessonplay.summary import load_summary, refresh_summary
+from lessonplay.timing import show_timing_panel, stage, start_run
 
 st.set_page_config(page_title="시나리오별 전체 학생 변화 추이", layout="wide")
 st.title("📊 시나리오별 전체 학생 변화 추이 (모든 학생 포함)")
+start_run("전체 학생 변화")
 
-DATA_PATH = "data/summary.csv"
+# ✅ 전사 CSV가 바뀌었으면 세션 인덱스와 요약 파일(data/.cache/summary.parquet)을 먼저 갱신
+with stage("요약 갱신"):
+    refresh_summary()
 
-if not os.path.exists(DATA_PATH):
-    st.warning("⚠️ summary.csv 파일이 없습니다. 먼저 데이터 정리 페이지에서 생성하세요.")
-else:
-    df = pd.read_csv(DATA_PATH)
+# ✅ 입력 수가 0인 데이터는 제외된 요약 표 (파일이 바뀔 때만 다시 읽음 — 공유 프레임이므로 직접 고치지 않음)
+with stage("요약 읽기") as s:
+    df = load_summary()
+    s["rows"] = None if df is None else len(df)
+
+
+def student_lines(sub_df, columns):
+    """모든 학생의 선을 한 trace로 그리기 위한 배열
 
-    # ✅ 입력 수가 0인 데이터 제외
-    df = df[df["입력 수"] > 0]
+    사용자 → 날짜 → 회차 순으로 정렬하고, 학생이 바뀌는 자리마다 빈 점(None)을 끼워 선을 끊습니다.
+    반환값: {컬럼: object 배열} — 모두 같은 길이
+    """
+    sub_df = sub_df.sort_values(["사용자", "날짜", "회차"], kind="stable")
+    codes, _ = pd.factorize(sub_df["사용자"])
+    n_rows = len(sub_df)
+    n_users = codes.max() + 1 if n_rows else 0
 
+    # 각 행의 자리 = 행 번호 + 앞선 학생 수 (학생마다 빈 점 하나)
+    positions = np.arange(n_rows) + codes
+    lines = {}
+    for col in columns:
+        values = np.full(n_rows + max(n_users - 1, 0), None, dtype=object)
+        values[positions] = sub_df[col].to_numpy(dtype=object)
+        lines[col] = values
+    return lines
+
+
+if df is None:
+    st.warning("⚠️ 요약 데이터가 없습니다. data 폴더에 전사 CSV 파일이 있는지 확인하세요.")
+else:
     # 날짜 변환 및 정렬
-    df["날짜"] = pd.to_datetime(df["날짜"], errors="coerce")
+    df = df.assign(날짜=pd.to_datetime(df["날짜"], errors="coerce"))
     df = df.sort_values(["시나리오", "사용자", "날짜", "회차"])
 
     # 시나리오 목록
@@ -30,6 +58,17 @@ else:
         "입력 수": "#66CC66"  # 밝은 초록색
     }
 
+    # 📈 지표별 선 모양
+    line_styles = {
+        "High": dict(width=3.5, color=colors["High"]),
+        "Low": dict(width=3.5, color=colors["Low"]),
+        "입력 수": dict(width=3.5, color=colors["입력 수"], dash="dot"),
+    }
+
+    # ✅ 학생 수가 많으면 WebGL이 더 빠름 (둘 다 지표마다 trace 하나)
+    render_mode = st.radio("그래프 렌더링", ["SVG", "WebGL"], horizontal=True)
+    trace_type = go.Scattergl if render_mode == "WebGL" else go.Scatter
+
     for scenario in scenarios:
         st.markdown(f"## 🧩 시나리오: {scenario}")
 
@@ -40,110 +79,47 @@ else:
         sub_df["x_label"] = sub_df["날짜"].dt.strftime("%m/%d") + " (" + sub_df["회차"].astype(str) + "회)"
         x_order = sub_df["x_label"].unique().tolist()  # ✅ Plotly에서 이 순서 유지
 
-        # ---------------------------
-        # ① High 변화 (모든 학생)
-        # ---------------------------
-        fig_high = go.Figure()
-        for user, user_df in sub_df.groupby("사용자"):
-            fig_high.add_trace(go.Scatter(
-                x=user_df["x_label"],
-                y=user_df["High"],
-                mode="lines+markers",
-                name=user,
-                line=dict(width=3.5, color=colors["High"]),
-                marker=dict(size=7, color=colors["High"]),
-                opacity=0.8,
-                hovertemplate=(
-                    f"<b>{user}</b><br>" +
-                    "날짜(회차): %{x}<br>" +
-                    "High: %{y}<extra></extra>"
-                )
-            ))
-
-        fig_high.update_layout(
-            title=f"{scenario} | High 변화 (모든 학생)",
-            xaxis_title="날짜(회차)",
-            yaxis_title="횟수",
-            xaxis=dict(
-                categoryorder="array",
-                categoryarray=x_order,
-                tickangle=-30
-            ),
-            height=400,
-            margin=dict(l=40, r=40, t=60, b=80),
-            showlegend=False,
-            plot_bgcolor="white"
-        )
-        st.plotly_chart(fig_high, use_container_width=True)
-
-        # ---------------------------
-        # ② Low 변화 (모든 학생)
-        # ---------------------------
-        fig_low = go.Figure()
-        for user, user_df in sub_df.groupby("사용자"):
-            fig_low.add_trace(go.Scatter(
-                x=user_df["x_label"],
-                y=user_df["Low"],
-                mode="lines+markers",
-                name=user,
-                line=dict(width=3.5, color=colors["Low"]),
-                marker=dict(size=7, color=colors["Low"]),
-                opacity=0.8,
-                hovertemplate=(
-                    f"<b>{user}</b><br>" +
-                    "날짜(회차): %{x}<br>" +
-                    "Low: %{y}<extra></extra>"
-                )
-            ))
-
-        fig_low.update_layout(
-            title=f"{scenario} | Low 변화 (모든 학생)",
-            xaxis_title="날짜(회차)",
-            yaxis_title="횟수",
-            xaxis=dict(
-                categoryorder="array",
-                categoryarray=x_order,
-                tickangle=-30
-            ),
-            height=400,
-            margin=dict(l=40, r=40, t=60, b=80),
-            showlegend=False,
-            plot_bgcolor="white"
-        )
-        st.plotly_chart(fig_low, use_container_width=True)
+        # ✅ 세 지표를 한 번에 학생별로 나눔 (학생 사이는 빈 점으로 끊김)
+        with stage("학생별 배열 만들기", rows=len(sub_df)):
+            lines = student_lines(sub_df, ["x_label", "사용자"] + list(line_styles))
 
         # ---------------------------
-        # ③ 입력 수 변화 (모든 학생)
+        # ① High / ② Low / ③ 입력 수 변화 (모든 학생, 지표마다 trace 하나)
         # ---------------------------
-        fig_input = go.Figure()
-        for user, user_df in sub_df.groupby("사용자"):
-            fig_input.add_trace(go.Scatter(
-                x=user_df["x_label"],
-                y=user_df["입력 수"],
+        for metric, line_style in line_styles.items():
+            fig = go.Figure()
+            fig.add_trace(trace_type(
+                x=lines["x_label"],
+                y=lines[metric],
+                customdata=lines["사용자"],
                 mode="lines+markers",
-                name=user,
-                line=dict(width=3.5, color=colors["입력 수"], dash="dot"),
-                marker=dict(size=7, color=colors["입력 수"]),
+                name=metric,
+                line=line_style,
+                marker=dict(size=7, color=line_style["color"]),
                 opacity=0.8,
+                connectgaps=False,
                 hovertemplate=(
-                    f"<b>{user}</b><br>" +
+                    "<b>%{customdata}</b><br>" +
                     "날짜(회차): %{x}<br>" +
-                    "입력 수: %{y}<extra></extra>"
+                    f"{metric}: %{{y}}<extra></extra>"
                 )
             ))
 
-        fig_input.update_layout(
-            title=f"{scenario} | 입력 수 변화 (모든 학생)",
-            xaxis_title="날짜(회차)",
-            yaxis_title="횟수",
-            xaxis=dict(
-                categoryorder="array",
-                categoryarray=x_order,
-                tickangle=-30
-            ),
-            height=400,
-            margin=dict(l=40, r=40, t=60, b=80),
-            showlegend=False,
-            plot_bgcolor="white"
-        )
-        st.plotly_chart(fig_input, use_container_width=True)
+            fig.update_layout(
+                title=f"{scenario} | {metric} 변화 (모든 학생)",
+                xaxis_title="날짜(회차)",
+                yaxis_title="횟수",
+                xaxis=dict(
+                    categoryorder="array",
+                    categoryarray=x_order,
+                    tickangle=-30
+                ),
+                height=400,
+                margin=dict(l=40, r=40, t=60, b=80),
+                showlegend=False,
+                plot_bgcolor="white"
+            )
+            with stage("그래프 전송 (Plotly 직렬화)"):
+                st.plotly_chart(fig, use_container_width=True)
+
+show_timing_panel()
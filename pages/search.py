@@ -0,0 +1,88 @@
+import streamlit as st
+
+from lessonplay.search import (
+    NGRAM,
+    attach_session_meta,
+    load_search_index,
+    query_terms,
+    search,
+    update_search_index,
+)
+from lessonplay.session_index import index_version, shared_index
+from lessonplay.timing import show_timing_panel, stage, start_run
+
+st.set_page_config(page_title="전사 검색", layout="wide")
+st.title("🔎 전사 발화 검색")
+start_run("전사 검색")
+
+FILTER_COLUMNS = ["화자", "사용자", "날짜", "시나리오", "수업"]
+
+
+# ---------------------------
+# ① 검색 색인 갱신 (converted_txt에서 바뀐 TXT만 다시 읽음)
+# ---------------------------
+with st.sidebar:
+    rebuild = st.button("🔄 검색 색인 다시 만들기", help="저장된 검색 색인을 버리고 converted_txt의 모든 TXT를 다시 읽습니다.")
+
+with stage("검색 색인 갱신") as s:
+    stats = update_search_index(rebuild=rebuild)
+    s["rows"] = stats["indexed"]
+
+with st.sidebar:
+    st.caption(
+        f"검색 색인: 발화 {stats['utterances']:,}개 · 재사용 {stats['reused']}개 · "
+        f"새로 읽음 {stats['indexed']}개 · 삭제 {stats['removed']}개 · 세그먼트 {stats['segments']}개"
+    )
+
+with stage("색인 읽기"):
+    index = load_search_index()
+
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+def search_docs(generation, session_version, _index, _index_df):
+    """발화 + 세션 정보 (색인 세대·세션 인덱스 버전이 같으면 모든 세션이 공유)"""
+    return attach_session_meta(_index["docs"], _index_df)
+
+
+if index is None or not stats["utterances"]:
+    st.warning("⚠️ 검색할 TXT가 없습니다. 먼저 'CSV → TXT 변환' 페이지에서 변환을 실행하세요.")
+else:
+    with stage("세션 정보 붙이기") as s:
+        index_df, _, _ = shared_index()
+        docs = search_docs(index["generation"], index_version(index_df), index, index_df)
+        s["rows"] = len(docs)
+
+    # ---------------------------
+    # ② 검색어 + 필터
+    # ---------------------------
+    query = st.text_input("검색어", placeholder="예: 소인수분해 (띄어쓰기는 무시, 여러 단어는 모두 포함)")
+
+    filters = {}
+    cols = st.columns(len(FILTER_COLUMNS))
+    for col, name in zip(cols, FILTER_COLUMNS):
+        options = sorted(docs[name].dropna().astype(str).unique().tolist())
+        filters[name] = col.multiselect(name, options)
+    limit = st.slider("최대 결과 수", 10, 500, 50, step=10)
+
+    # ---------------------------
+    # ③ 결과 (점수순 + 앞뒤 발화)
+    # ---------------------------
+    terms = query_terms(query)
+    if terms and all(len(t) < NGRAM for t in terms):
+        # ✅ 한 글자 단어는 역색인으로 좁힐 수 없어 전체 발화를 훑게 되므로, 긴 단어와 함께일 때만 검색
+        st.info(f"🔎 {NGRAM}글자 이상인 단어를 하나 이상 넣어 주세요. (한 글자 단어는 다른 단어와 함께 쓰면 같이 확인합니다)")
+    elif terms:
+        with stage("검색") as s:
+            results = search(index, query, docs, filters={k: v for k, v in filters.items() if v}, limit=limit)
+            s["rows"] = len(results)
+
+        st.caption(f"결과 {len(results)}개" + (f" (상위 {limit}개까지)" if len(results) == limit else ""))
+        st.dataframe(
+            results[["점수", "사용자", "날짜", "시나리오", "수업", "화자", "앞 발화", "메시지", "뒤 발화", "파일", "turn"]],
+            hide_index=True,
+            use_container_width=True,
+        )
+    else:
+        st.info("🔎 검색어를 입력하세요.")
+
+show_timing_panel()
@@ -0,0 +1,62 @@
+import streamlit as st
+import pandas as pd
+
+from lessonplay.ingest import FOLDERS
+from lessonplay.session_index import shared_index
+from lessonplay.timing import show_timing_panel, stage, start_run
+from lessonplay.upload import EXPECTED_HEADER, import_zip
+
+st.set_page_config(page_title="전사 ZIP 올리기", layout="wide")
+st.title("📤 전사 CSV ZIP 올리기")
+start_run("ZIP 올리기")
+
+st.markdown(
+    f"내보낸 전사 CSV를 ZIP으로 묶어 올리면 머리줄(`{','.join(EXPECTED_HEADER)}`)과 날짜를 확인한 뒤 "
+    "`data/<수업>/<YYMMDD>/` 폴더에 나눠 넣고, 새 파일만 세션 인덱스에 추가합니다."
+)
+
+# -----------------------------
+# 📦 ZIP 선택
+# -----------------------------
+uploaded = st.file_uploader("ZIP 파일", type=["zip"])
+default_lesson = st.selectbox(
+    "수업 (ZIP 안 경로에 Rehearsal/TeachingMethod 폴더가 없을 때)", FOLDERS,
+)
+
+# -----------------------------
+# 🚀 가져오기
+# -----------------------------
+if uploaded is not None and st.button("📥 가져오기"):
+    bar = st.progress(0.0, text="준비 중...")
+
+    def show_progress(step, done, total):
+        bar.progress(done / total if total else 1.0, text=f"{step}: {done:,} / {total:,}")
+
+    with stage("ZIP 풀기·확인·옮기기") as s:
+        report = import_zip(uploaded, default_lesson, progress=show_progress)
+        s["rows"] = len(report["imported"])
+
+    # ✅ 새로 넣은 파일만 세션 인덱스에 추가 (폴더 전체를 다시 훑지 않음) — 다른 세션이 보는 공유 인덱스도 버림
+    bar.progress(1.0, text="세션 인덱스 갱신 중...")
+    with stage("세션 인덱스 갱신 (새 파일만)") as s:
+        index_df, index_errors, index_stats = shared_index(changed=report["imported"])
+        s["rows"] = index_stats["parsed"]
+    bar.empty()
+
+    st.success(
+        f"✅ 가져오기 완료! 새 파일 {len(report['imported']):,}개 · "
+        f"이미 있음 {len(report['skipped']):,}개 · 실패 {len(report['errors']):,}개"
+    )
+    st.caption(
+        f"세션 인덱스: 새로 읽음 {index_stats['parsed']}건 · 전체 {len(index_df):,}건"
+    )
+
+    if report["imported"]:
+        st.dataframe(pd.DataFrame({"새로 넣은 파일": report["imported"]}), hide_index=True)
+    if report["errors"] or index_errors:
+        st.subheader("⚠️ 가져오지 못한 파일")
+        st.dataframe(pd.DataFrame(report["errors"] + index_errors, columns=["파일명", "오류"]), hide_index=True)
+elif uploaded is None:
+    st.info("📂 ZIP 파일을 올린 뒤 '가져오기' 버튼을 누르세요.")
+
+show_timing_panel()
@@ -1,247 +1,236 @@
 import streamlit as st
-import pandas as pd
 import os
-import re
-from datetime import datetime
+
+# 첫 화면까지는 표준 라이브러리만 쓰는 모듈만 불러옴 (pandas·pyarrow는 ⓪ 다음에)
+from lessonplay.bootstrap import load_bootstrap, save_bootstrap
+from lessonplay.timing import show_timing_panel, stage, start_run
 
 st.set_page_config(page_title="Lesson Play 데이터 정리", layout="wide")
 st.title("📊 Lesson Play 데이터 정리")
+start_run("요약")
 
 BASE_DIR = "data"
-folders = ["Rehearsal", "TeachingMethod"]
 
 
-# ---------------------------
-# ① CSV 내부 또는 파일명에서 날짜/시간 파싱 함수
-# ---------------------------
-def parse_korean_datetime(raw_datetime_str: str):
-    """CSV 내부 B2 셀 등에서 '2025. 9. 11. 오후 12-05-27' 형식을 처리"""
-    if not isinstance(raw_datetime_str, str):
-        return "", ""
-    s = raw_datetime_str.strip()
-    if not s:
-        return "", ""
-
-    s = re.sub(r"\s+", " ", s)
-    pattern = r"(\d{4})\.\s*(\d{1,2})\.\s*(\d{1,2})\.\s*(오전|오후)\s*(\d{1,2})-(\d{1,2})(?:-\d{1,2})?"
-    m = re.search(pattern, s)
-    if not m:
-        return "", ""
-
-    year, month, day, ampm, hour, minute = m.groups()
-    year, month, day, hour, minute = map(int, [year, month, day, hour, minute])
-    if ampm == "오전" and hour == 12:
-        hour = 0
-    elif ampm == "오후" and hour != 12:
-        hour += 12
-
-    date_str = f"{year:04d}-{month:02d}-{day:02d}"
-    time_str = f"{hour:02d}{minute:02d}"
-    return date_str, time_str
-
-
-def parse_datetime_from_filename(filename: str):
-    """파일명에서 '2025. 9. 11. 오후 12-05-27' 형식을 인식"""
-    s = os.path.basename(filename)
-    pattern = r"(\d{4})\.\s*(\d{1,2})\.\s*(\d{1,2})\.\s*(오전|오후)\s*(\d{1,2})-(\d{1,2})"
-    m = re.search(pattern, s)
-    if not m:
-        return "", ""
-    year, month, day, ampm, hour, minute = m.groups()
-    year, month, day, hour, minute = map(int, [year, month, day, hour, minute])
-    if ampm == "오전" and hour == 12:
-        hour = 0
-    elif ampm == "오후" and hour != 12:
-        hour += 12
-    return f"{year:04d}-{month:02d}-{day:02d}", f"{hour:02d}{minute:02d}"
+def filter_widgets(options):
+    """수업·시나리오·사용자 선택 상자 + 체크박스 → (수업, 시나리오, 사용자, 입력 0 제외, 중복 제외)"""
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        selected_lesson = st.selectbox("수업 선택", ["전체"] + options["수업"])
+    with col2:
+        selected_scenario = st.selectbox("시나리오 선택", ["전체"] + options["시나리오"])
+    with col3:
+        selected_user = st.selectbox("사용자 선택", ["전체"] + options["사용자"])
+
+    # ✅ 입력 수가 0인 데이터 제외 체크박스
+    exclude_zero = st.checkbox("입력 수가 0인 데이터 제외", value=True)
+    # ✅ 거의 같은 세션(같은 대화를 두 번 저장한 CSV, ALL_* 묶음 파일 등) 제외
+    exclude_duplicates = st.checkbox(
+        "중복 세션 제외", value=True,
+        help="발화가 거의 같은 세션은 하나(입력 수가 많은 쪽)만 남깁니다. 빠진 행은 '중복 원본'에 원본 파일이 적혀 있습니다.",
+    )
+    return selected_lesson, selected_scenario, selected_user, exclude_zero, exclude_duplicates
 
 
 # ---------------------------
-# ② 데이터 요약 수집
+# ⓪ 첫 화면 — 지난번에 저장한 부트스트랩(필터 선택지·세션 수)으로 필터부터 그림
 # ---------------------------
-summary = []
-
-for folder in folders:
-    root_path = os.path.join(BASE_DIR, folder)
-    if not os.path.exists(root_path):
-        continue
-
-    for root, dirs, files in os.walk(root_path):
-        for file in files:
-            if not file.endswith(".csv"):
-                continue
-
-            file_path = os.path.join(root, file)
-
-            try:
-                df = pd.read_csv(file_path, header=None)
-            except Exception as e:
-                st.warning(f"{file} 불러오는 중 오류 발생: {e}")
-                continue
-
-            # 수업 구분
-            lesson_type = "Rehearsal" if "Rehearsal" in folder else "TeachingMethod"
-
-            # 날짜/시간 (1️⃣ CSV 내부 → 2️⃣ 파일명 순으로 시도)
-            raw_datetime = str(df.iloc[1, 1]) if (len(df.columns) > 1 and len(df) > 1) else ""
-            date_str, time_str = parse_korean_datetime(raw_datetime)
-            if not date_str:
-                date_str, time_str = parse_datetime_from_filename(file)
-
-            # 시나리오
-            scenario_cell = str(df.iloc[1, 3]) if len(df.columns) > 3 and len(df) > 1 else ""
-            if scenario_cell.startswith("120의 약수"):
-                scenario = "약수"
-            elif scenario_cell.startswith("선생님,"):
-                scenario = "명제"
-            else:
-                scenario = ""
-
-            # 사용자
-            user = str(df.iloc[1, 0]) if len(df) > 1 else ""
-
-            # 피드백 유무
-            has_feedback = 1 if (df.shape[1] > 4 and "AI 피드백" in str(df.iloc[0, 4])) else 0
-
-            # 입력 수 / 발문 수 / 설명 수
-            input_count = question_count = explanation_count = 0
-            if scenario == "명제":
-                teacher_msgs = df[df.iloc[:, 2] == "교사"] if df.shape[1] > 2 else pd.DataFrame()
-            elif scenario == "약수":
-                if len(df) > 8 and df.shape[1] > 2:
-                    df_sub = df.iloc[8:]
-                    teacher_msgs = df_sub[df_sub.iloc[:, 2] == "교사"]
-                else:
-                    teacher_msgs = pd.DataFrame()
-            else:
-                teacher_msgs = pd.DataFrame()
-
-            if not teacher_msgs.empty and df.shape[1] > 3:
-                input_count = len(teacher_msgs)
-                msgs = teacher_msgs.iloc[:, 3].astype(str)
-                question_count = msgs.str.endswith("?").sum()
-                explanation_count = input_count - question_count
-
-            # 회차 ID
-            session_id = f"{user}_{date_str}"
-
-            summary.append({
-                "수업": lesson_type,
-                "날짜": date_str,
-                "시간": time_str,
-                "시나리오": scenario,
-                "사용자": user,
-                "입력 수": input_count,
-                "발문 수": question_count,
-                "설명 수": explanation_count,
-                "피드백 유무": has_feedback,
-                "파일 경로": file_path,
-                "session_id": session_id
-            })
+with st.sidebar:
+    rebuild_index = st.button("🔄 인덱스 다시 만들기", help="저장된 세션 인덱스를 버리고 모든 CSV를 다시 읽습니다.")
+    live = st.toggle(
+        "🔴 실시간 갱신", value=True,
+        help="data 폴더를 감시하다가 CSV가 생기거나 바뀌면 그 파일만 다시 읽고 화면을 새로 그립니다.",
+    )
+
+filter_area = st.container()
+filter_state = count_area = None
+boot = load_bootstrap()
+if boot is not None:
+    with stage("첫 화면 (부트스트랩)"), filter_area:
+        filter_state = filter_widgets(boot["options"])
+        count_area = st.empty()
+        count_area.markdown(f"**총 데이터 수: 확인 중…** (지난 요약 기준 세션 {boot['rows']:,}건)")
+
+# 무거운 모듈은 첫 화면을 보낸 뒤에 불러옴 (프로세스에서 처음 한 번만 시간이 듦)
+with stage("모듈 불러오기 (pandas·pyarrow)"):
+    from lessonplay.corpus import corpus_nbytes, load_corpus, session_code, session_frame
+    from lessonplay.export import EXPORT_FORMATS, export_bytes, export_file_name
+    from lessonplay.filters import build_filter_index, select_positions
+    from lessonplay.session_index import shared_index
+    from lessonplay.shared_cache import shared_cache_stats
+    from lessonplay.summary import build_summary, current_version, materialize_summary
+    from lessonplay.watch import start_watcher, watch_generation, watching
+
 
 
 # ---------------------------
-# ③ 데이터프레임 출력
+# ① 세션 인덱스 갱신 (새로 생기거나 바뀐 CSV만 다시 파싱)
 # ---------------------------
-if summary:
-    df_all = pd.DataFrame(summary)
-
-    # ✅ 정렬 (회차 계산 전)
-    df_all = df_all.sort_values(
-        by=["수업", "날짜", "사용자", "시간"],
-        ascending=[True, True, True, True]
+# ✅ 파일 감시기가 돌고 있으면 폴더 전체를 훑지 않고 감시기가 모은 파일만 다시 읽음
+#    인덱스는 프로세스에 하나 — 여러 세션이 동시에 열어도 한 세션만 갱신하고 나머지는 그 결과를 씀
+if live and start_watcher(BASE_DIR):
+    st.session_state["watch_generation"] = watch_generation()
+
+with stage("세션 인덱스 갱신") as s:
+    index_df, index_errors, index_stats = shared_index(rebuild=rebuild_index, watch=live)
+    s["rows"] = len(index_df)
+
+for file, err in index_errors:
+    st.warning(f"{file} 불러오는 중 오류 발생: {err}")
+
+with st.sidebar:
+    st.caption(
+        f"세션 인덱스: 재사용 {index_stats['reused']}건 · "
+        f"새로 읽음 {index_stats['parsed']}건 · 삭제 {index_stats['removed']}건"
     )
-
-    # ✅ (수업, 날짜, 사용자)별로 시간 순서에 따라 회차 부여
-    df_all["회차"] = (
-        df_all.groupby(["수업", "날짜", "사용자"])
-              .cumcount() + 1
+    shared = shared_cache_stats()
+    st.caption(
+        f"공유 캐시: {shared['entries']}개 · {shared['bytes'] / 2**20:,.1f} MB · "
+        f"적중 {shared['hits']} · 다른 세션 기다림 {shared['joined']}"
     )
 
-    # 인덱스 다시 1부터 부여
-    df_all = df_all.reset_index(drop=True)
-    df_all.index = df_all.index + 1
 
-    # ✅ highlow.csv 불러오기 및 매칭
-    highlow_path = os.path.join(BASE_DIR, "highlow.csv")
-    if os.path.exists(highlow_path):
-        highlow_df = pd.read_csv(highlow_path)
-
-        def normalize_filename(name: str):
-            """파일명 정규화: 확장자 제거 + 공백 정리 + 오전/오후 표준화"""
-            s = os.path.splitext(str(name).strip())[0]
-            s = s.replace("  ", " ")
-            s = re.sub(r"\s+", " ", s)
-            s = s.replace("AM", "오전").replace("PM", "오후")
-            return s
-
-        # Key 생성
-        highlow_df["Key"] = highlow_df["Filename"]
-        df_all["Key"] = df_all["파일 경로"].apply(lambda x: normalize_filename(os.path.basename(x)))
-
-        # 디버깅용 출력 (체크용)
-        # st.write(highlow_df[["Filename", "Key"]].head())
-        # st.write(df_all[["파일 경로", "Key"]].head())
-
-        # 병합
-        df_all = df_all.merge(
-            highlow_df[["Key", "High", "Low"]],
-            on="Key",
-            how="left"
-        )
+@st.fragment(run_every=2)
+def follow_data_folder():
+    """감시기가 새 이벤트를 받았으면 (이 세션이 마지막으로 본 번호와 다르면) 화면 전체를 다시 실행"""
+    if watch_generation() != st.session_state.get("watch_generation"):
+        st.rerun()
+    st.caption("👀 data 폴더 감시 중")
 
-        df_all = df_all.drop(columns=["Key"])
 
-        # High, Low 값이 없는 경우 NaN 대신 0으로
-        df_all["High"] = df_all["High"].fillna(0).astype(int)
-        df_all["Low"] = df_all["Low"].fillna(0).astype(int)
+if live and watching():
+    with st.sidebar:
+        follow_data_folder()
 
-    else:
-        st.warning("⚠️ data/highlow.csv 파일이 존재하지 않습니다. High/Low 열은 표시되지 않습니다.")
 
-    # ✅ 멀티 필터
-    lesson_options = ["전체"] + sorted(df_all["수업"].unique().tolist())
-    scenario_options = ["전체"] + sorted(df_all["시나리오"].unique().tolist())
-    user_options = ["전체"] + sorted(df_all["사용자"].unique().tolist())
+# ---------------------------
+# ② 요약 표 준비 (데이터 버전마다 한 번)
+# ---------------------------
+@st.cache_resource(max_entries=4, show_spinner=False)
+def build_summary_table(data_version, _index_df, highlow_path):
+    """회차 부여 + highlow 매칭 + 필터 인덱스 — 같은 데이터 버전이면 모든 세션이 결과를 공유합니다."""
+    df_all, highlow_report = build_summary(_index_df, highlow_path)
+
+    # ✅ 진행 추이 페이지들이 읽는 요약 파일도 같은 버전으로 맞춤
+    materialize_summary(_index_df, highlow_path, summary=df_all)
+
+    # ✅ 필터 인덱스 (값 → 행 위치)
+    filter_index = build_filter_index(
+        df_all, ["수업", "시나리오", "사용자"],
+        flags={"입력 있음": df_all["입력 수"] > 0, "원본 세션": df_all["중복 원본"] == ""},
+    )
+    return df_all, highlow_report, filter_index
 
-    col1, col2, col3 = st.columns(3)
-    with col1:
-        selected_lesson = st.selectbox("수업 선택", lesson_options)
-    with col2:
-        selected_scenario = st.selectbox("시나리오 선택", scenario_options)
-    with col3:
-        selected_user = st.selectbox("사용자 선택", user_options)
 
-    # ✅ 필터 적용
-    filtered_df = df_all.copy()
-    if selected_lesson != "전체":
-        filtered_df = filtered_df[filtered_df["수업"] == selected_lesson]
-    if selected_scenario != "전체":
-        filtered_df = filtered_df[filtered_df["시나리오"] == selected_scenario]
-    if selected_user != "전체":
-        filtered_df = filtered_df[filtered_df["사용자"] == selected_user]
+@st.cache_data(max_entries=16, show_spinner="내보낼 파일을 만드는 중...")
+def build_export(data_version, filter_state, fmt, _df):
+    """필터 결과 → 내보내기 파일 바이트 — (데이터 버전, 필터 상태, 형식)이 같으면 다시 만들지 않습니다."""
+    return export_bytes(_df, fmt)
 
-    # ✅ 입력 수가 0인 데이터 제외 체크박스
-    exclude_zero = st.checkbox("입력 수가 0인 데이터 제외", value=True)
-    if exclude_zero:
-        filtered_df = filtered_df[filtered_df["입력 수"] > 0]
+
+# ---------------------------
+# ③ 데이터프레임 출력
+# ---------------------------
+if not index_df.empty:
+    highlow_path = os.path.join(BASE_DIR, "highlow.csv")
+    data_version = current_version(index_df, highlow_path)
+    with stage("요약 표 준비 (캐시)") as s:
+        df_all, highlow_report, filter_index = build_summary_table(data_version, index_df, highlow_path)
+        s["rows"] = len(df_all)
+
+    # ✅ 다음 실행의 첫 화면용 부트스트랩 — 데이터가 바뀌어 선택지가 달라졌으면 새 선택지로 한 번 더 그림
+    if save_bootstrap(data_version, filter_index) and boot is not None and boot["options"] != filter_index["options"]:
+        st.rerun()
+
+    if highlow_report is None:
+        st.warning("⚠️ data/highlow.csv 파일이 존재하지 않습니다. High/Low 열은 표시되지 않습니다.")
+    else:
+        n_sessions = len(highlow_report["unmatched_sessions"])
+        n_highlow = len(highlow_report["unmatched_highlow"])
+        if n_sessions or n_highlow or highlow_report["duplicated"]:
+            with st.expander(
+                f"⚠️ High/Low 매칭 확인: 짝 없는 세션 {n_sessions}건 · 세션 없는 highlow 행 {n_highlow}건"
+            ):
+                st.write("**highlow.csv에 없는 세션** (High/Low = 0)", highlow_report["unmatched_sessions"])
+                st.write("**세션 파일이 없는 highlow.csv 행**", highlow_report["unmatched_highlow"])
+                if highlow_report["duplicated"]:
+                    st.write("**highlow.csv 안에서 중복된 키** (첫 행 사용)", highlow_report["duplicated"])
+
+    # ✅ 멀티 필터 (부트스트랩이 없던 첫 실행이면 여기서 필터 인덱스의 선택지로 그림)
+    if filter_state is None:
+        with filter_area:
+            filter_state = filter_widgets(filter_index["options"])
+            count_area = st.empty()
+    selected_lesson, selected_scenario, selected_user, exclude_zero, exclude_duplicates = filter_state
+
+    # ✅ 필터 적용 (행 위치 교집합 → 해당 행만 꺼냄)
+    with stage("필터 적용") as s:
+        positions = select_positions(
+            filter_index,
+            {
+                "수업": None if selected_lesson == "전체" else selected_lesson,
+                "시나리오": None if selected_scenario == "전체" else selected_scenario,
+                "사용자": None if selected_user == "전체" else selected_user,
+            },
+            flags=(["입력 있음"] if exclude_zero else []) + (["원본 세션"] if exclude_duplicates else []),
+        )
+        filtered_df = df_all.iloc[positions]
+        s["rows"] = len(filtered_df)
 
     # ✅ 데이터 수 표시
     total_rows = len(filtered_df)
-    st.markdown(f"**총 데이터 수: {total_rows}건**")
+    count_area.markdown(f"**총 데이터 수: {total_rows}건**")
 
     # ✅ 컬럼 순서 정리 (High/Low 추가됨)
     filtered_df = filtered_df[
         ["수업", "날짜", "시간", "시나리오", "사용자", "회차",
-         "입력 수", "발문 수", "설명 수", "High", "Low", "피드백 유무", "파일 경로"]
+         "입력 수", "발문 수", "설명 수", "High", "Low", "피드백 유무", "파일 경로", "중복 원본"]
     ]
 
     # ✅ 테이블 출력
-    st.dataframe(filtered_df, use_container_width=True)
-
-    # ✅ CSV 다운로드
-    csv = filtered_df.to_csv(index=False, encoding="utf-8-sig")
-    st.download_button("📥 통합 CSV 다운로드", csv, "summary.csv", "text/csv")
+    with stage("표 출력 (Arrow 직렬화)", rows=len(filtered_df)):
+        st.dataframe(filtered_df, use_container_width=True)
+
+    # ✅ 세션 전사 보기 (발화는 프로세스 전체가 공유하는 배열 코퍼스에서 꺼냄)
+    with st.expander("🗒️ 세션 전사 보기"):
+        session_path = st.selectbox(
+            "세션 선택", filtered_df["파일 경로"].tolist(), index=None, placeholder="파일 경로를 고르세요",
+            format_func=os.path.basename,
+        )
+        if session_path:
+            with stage("전사 꺼내기 (코퍼스)") as s:
+                corpus = load_corpus()
+                code = session_code(corpus, session_path)
+                transcript = None if code is None else session_frame(corpus, code)
+                s["rows"] = None if transcript is None else len(transcript)
+            if transcript is None:
+                st.warning("⚠️ 발화 저장소에 이 세션이 없습니다.")
+            else:
+                st.dataframe(transcript, hide_index=True, use_container_width=True)
+            st.caption(
+                f"코퍼스: 세션 {len(corpus['sessions']):,}개 · 발화 {len(corpus['turn']):,}개 · "
+                f"메모리 {corpus_nbytes(corpus) / 1024:,.0f} KB"
+            )
+
+    # ✅ 다운로드 (요청할 때만 파일을 만들고, 같은 데이터·필터·형식이면 캐시 재사용)
+    col_fmt, col_make = st.columns([2, 1], vertical_alignment="bottom")
+    with col_fmt:
+        export_format = st.selectbox("내보내기 형식", list(EXPORT_FORMATS))
+    with col_make:
+        if st.button("📦 다운로드 파일 만들기"):
+            st.session_state["export_request"] = (data_version, filter_state, export_format)
+
+    if st.session_state.get("export_request") == (data_version, filter_state, export_format):
+        with stage(f"내보내기 ({export_format})", rows=len(filtered_df)):
+            data = build_export(data_version, filter_state, export_format, filtered_df)
+        st.download_button(
+            "📥 통합 CSV 다운로드" if export_format.startswith("CSV") else "📥 통합 Parquet 다운로드",
+            data, export_file_name("summary", export_format), EXPORT_FORMATS[export_format][1]
+        )
 
 else:
+    if count_area is not None:
+        count_area.empty()
     st.info("📂 data 폴더에 분석할 CSV 파일이 없습니다.")
+
+show_timing_panel()